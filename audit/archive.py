@@ -0,0 +1,307 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+from common.pagination import decode_keyset_cursor, encode_position
+from .models import AuditLog
+
+SEGMENT_SUFFIX = '.jsonl.gz'
+INDEX_SUFFIX = '.idx.json'
+OBJECTS_DIR = 'objects'  # Per-object indexes: <DIR>/objects/<2 hex>/<sha256>.jsonl
+ARCHIVE_START = 'start'  # Archive cursor of an object's newest archived entry
+ARCHIVED_FIELDS = ('id', 'content_type_id', 'object_id', 'action', 'changes', 'created_at', 'updated_at')
+
+_datetime_field = serializers.DateTimeField()
+
+
+def _config(key):
+    return settings.AUDIT_ARCHIVE[key]
+
+
+def _object_key(content_type_id, object_id):
+    return f"{content_type_id}:{object_id}"
+
+
+def _object_index_path(directory, key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return directory / OBJECTS_DIR / digest[:2] / f"{digest}.jsonl"
+
+
+def _append_object_index(directory, key, entry):
+    """
+    One line per segment that holds entries of the object:
+    {"segment": "<month>/<file>", "lines": [...], "oldest": ..., "newest": ...}
+    """
+    path = _object_index_path(directory, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as handle:
+        handle.write(json.dumps(entry, separators=(',', ':')) + '\n')
+
+
+def _to_api_row(row):
+    """
+    Same shape as AuditLogSerializer output, so archived rows can be served
+    side by side with live ones.
+    """
+    return {
+        'id': row['id'],
+        'created_at': _datetime_field.to_representation(row['created_at']),
+        'updated_at': _datetime_field.to_representation(row['updated_at']),
+        'object_id': row['object_id'],
+        'action': row['action'],
+        'changes': row['changes'],
+        'content_type': row['content_type_id'],
+    }
+
+
+def _atomic_write(path, write):
+    """
+    Write to a temp file in the same directory, fsync, then rename: readers
+    either see the complete file or nothing.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            write(handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class SegmentWriter:
+    """
+    One append-only segment: gzip'd JSONL of audit rows from a single month,
+    plus a sidecar index {"<content_type>:<object_id>": [line numbers]}.
+    """
+    def __init__(self, directory, month, first_id):
+        self.directory = directory
+        self.path = directory / month / f"segment-{first_id:012d}{SEGMENT_SUFFIX}"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.month = month
+        self.lines = []
+        self.ids = []
+        self.objects = {}
+        self.bounds = {}  # key -> [oldest, newest] created_at of the object's rows
+        self.min_created_at = None
+        self.max_created_at = None
+
+    def add(self, row):
+        record = _to_api_row(row)
+        key = _object_key(row['content_type_id'], row['object_id'])
+        self.objects.setdefault(key, []).append(len(self.lines))
+        self.bounds.setdefault(key, [record['created_at'], None])[1] = record['created_at']
+        self.lines.append(json.dumps(record, separators=(',', ':')))
+        self.ids.append(row['id'])
+        self.min_created_at = self.min_created_at or record['created_at']
+        self.max_created_at = record['created_at']
+
+    def close(self):
+        payload = ('\n'.join(self.lines) + '\n').encode()
+        _atomic_write(self.path, lambda handle: handle.write(gzip.compress(payload)))
+
+        # The sidecar is what makes a segment visible to readers, so it goes last
+        index = {
+            'segment': self.path.name,
+            'month': self.month,
+            'rows': len(self.lines),
+            'min_created_at': self.min_created_at,
+            'max_created_at': self.max_created_at,
+            'objects': self.objects,
+        }
+        index_path = self.path.with_name(self.path.name[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX)
+        _atomic_write(index_path, lambda handle: handle.write(json.dumps(index).encode()))
+        _index_objects(self.directory, index, self.bounds)
+
+
+def _iter_expired_rows(cutoff, batch_size):
+    """
+    Keyset walk over (created_at, id): every batch is a fresh index range
+    query, so it is safe to delete already-archived rows while we go.
+    """
+    expired = AuditLog.objects.filter(created_at__lt=cutoff).order_by('created_at', 'id')
+    last = None
+    while True:
+        batch = expired
+        if last:
+            batch = batch.filter(
+                Q(created_at__gt=last['created_at']) | Q(created_at=last['created_at'], id__gt=last['id'])
+            )
+        rows = list(batch.values(*ARCHIVED_FIELDS)[:batch_size])
+        if not rows:
+            return
+        yield from rows
+        last = rows[-1]
+
+
+def archive_audit_logs(older_than_days=None, dry_run=False):
+    """
+    Retention Job:
+    Moves AuditLog rows older than the retention window into compressed
+    monthly segments, then deletes them from the live table in batches.
+    A segment is rolled over at SEGMENT_MAX_ROWS so memory stays bounded.
+    Returns the number of archived rows.
+    """
+    days = older_than_days if older_than_days is not None else _config('RETENTION_DAYS')
+    cutoff = timezone.now() - timedelta(days=days)
+    if dry_run:
+        return AuditLog.objects.filter(created_at__lt=cutoff).count()
+
+    directory = Path(_config('DIR'))
+    archived = 0
+    segment = None
+    for row in _iter_expired_rows(cutoff, _config('BATCH_SIZE')):
+        month = row['created_at'].strftime('%Y-%m')
+        if segment and (segment.month != month or len(segment.ids) >= _config('SEGMENT_MAX_ROWS')):
+            archived += _seal(segment)
+            segment = None
+        if segment is None:
+            segment = SegmentWriter(directory, month, row['id'])
+        segment.add(row)
+    if segment:
+        archived += _seal(segment)
+    return archived
+
+
+def _seal(segment):
+    """
+    Rows are only deleted once their segment is safely on disk.
+    """
+    segment.close()
+    batch_size = _config('BATCH_SIZE')
+    for start in range(0, len(segment.ids), batch_size):
+        AuditLog.objects.filter(id__in=segment.ids[start:start + batch_size]).delete()
+    return len(segment.ids)
+
+
+def _index_objects(directory, index, bounds=None):
+    """
+    Adds a sealed segment to the per-object index of every object in it, so
+    reading one object's history opens one small file instead of globbing
+    every segment. Without `bounds` (sidecars of older archives) the
+    segment's own time range is used.
+    """
+    segment = f"{index['month']}/{index['segment']}"
+    for key, lines in index['objects'].items():
+        oldest, newest = (bounds or {}).get(key) or (index['min_created_at'], index['max_created_at'])
+        _append_object_index(directory, key, {'segment': segment, 'lines': lines, 'oldest': oldest, 'newest': newest})
+
+
+def rebuild_object_indexes():
+    """
+    Rewrites every per-object index from the segment sidecars (archives made
+    before per-object indexes existed, or after restoring a backup).
+    Returns the number of segments indexed.
+    """
+    directory = Path(_config('DIR'))
+    if not directory.exists():
+        return 0
+    shutil.rmtree(directory / OBJECTS_DIR, ignore_errors=True)
+    segments = 0
+    for index_path in sorted(directory.glob(f"*/*{INDEX_SUFFIX}")):
+        with open(index_path) as handle:
+            _index_objects(directory, json.load(handle))
+        segments += 1
+    return segments
+
+
+def _object_segments(directory, key):
+    """
+    Segments holding entries of one object, newest first.
+    """
+    try:
+        with open(_object_index_path(directory, key)) as handle:
+            raw_lines = handle.read().splitlines()
+    except FileNotFoundError:
+        return []
+    segments = {}
+    for raw in raw_lines:
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            continue  # Torn line of an interrupted archive run
+        segments[entry['segment']] = entry  # A re-run that rewrote the segment wins
+    for entry in segments.values():
+        entry['oldest'], entry['newest'] = parse_datetime(entry['oldest']), parse_datetime(entry['newest'])
+    return sorted(segments.values(), key=lambda entry: entry['newest'], reverse=True)
+
+
+def _position(entry):
+    return parse_datetime(entry['created_at']), entry['id']
+
+
+def read_archived_history(content_type_id, object_id, before=None, limit=None):
+    """
+    Archived entries of one object, newest first, in AuditLogSerializer shape.
+    - before: (created_at, id) position; only entries strictly older are returned
+    - limit: at most this many entries
+    Only the segments listed in the object's index are decompressed, and
+    once `limit` entries are found, segments that are all older are not opened.
+    """
+    directory = Path(_config('DIR'))
+    entries = {}
+    for segment in _object_segments(directory, _object_key(content_type_id, object_id)):
+        if before is not None and segment['oldest'] > before[0]:
+            continue  # Everything in it is newer than the cursor
+        if limit is not None and len(entries) >= limit:
+            newest_first = sorted(entries.values(), key=_position, reverse=True)
+            if segment['newest'] < _position(newest_first[limit - 1])[0]:
+                break  # This and every later segment only hold older entries
+        wanted = set(segment['lines'])
+        last_line = max(wanted)
+        with gzip.open(directory / segment['segment'], 'rt') as handle:
+            for line_number, line in enumerate(handle):
+                if line_number in wanted:
+                    entry = json.loads(line)
+                    if before is None or _position(entry) < before:
+                        entries[entry['id']] = entry
+                if line_number >= last_line:
+                    break
+    result = sorted(entries.values(), key=_position, reverse=True)
+    return result if limit is None else result[:limit]
+
+
+def archived_history_page(content_type_id, object_id, cursor, page_size):
+    """
+    Keyset page of an object's archived history, continuing the live pages:
+    returns (rows, next_cursor) like common.pagination.keyset_page.
+    `cursor` is ARCHIVE_START or a token from a previous page. Entries that
+    are still in the live table (an archive run stopped before its DELETE)
+    are skipped: the live pages already served them.
+    """
+    position = None if cursor == ARCHIVE_START else decode_keyset_cursor(cursor)
+    if position is None and cursor != ARCHIVE_START:
+        return [], None
+    before = None
+    if position is not None:
+        try:
+            before = (position[0], int(position[1]))
+        except ValueError:
+            return [], None
+
+    rows = []
+    while len(rows) <= page_size:
+        batch = read_archived_history(content_type_id, object_id, before=before, limit=page_size + 1)
+        ids = [entry['id'] for entry in batch]
+        live = set(AuditLog.objects.filter(id__in=ids).values_list('id', flat=True)) if ids else set()
+        rows += [entry for entry in batch if entry['id'] not in live]
+        if len(batch) <= page_size:
+            break
+        before = _position(batch[-1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_position(rows[-1]['created_at'], rows[-1]['id'])
+    return rows, next_cursor
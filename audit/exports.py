@@ -0,0 +1,20 @@
+from .models import AuditLog
+
+# (column header, values_list lookup)
+AUDIT_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('created_at', 'created_at'),
+    ('content_type', 'content_type__model'),
+    ('object_id', 'object_id'),
+    ('action', 'action'),
+    ('changes', 'changes'),
+]
+
+
+def audit_export_queryset(queryset=None):
+    """
+    Oldest first on (created_at, id), which auditlog_created_id_idx serves directly.
+    """
+    if queryset is None:
+        queryset = AuditLog.objects.all()
+    return queryset.order_by('created_at', 'id')
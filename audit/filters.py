@@ -0,0 +1,36 @@
+from django.contrib.contenttypes.models import ContentType
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def filter_audit_logs(queryset, params):
+    """
+    Optional filters shared by the API and the export command (each one maps onto an index):
+    - content_type=inventory.asset&object_id=<id>  -> auditlog_object_idx
+    - action=ASSIGNED                              -> auditlog_action_idx
+    - since=<ISO datetime>&until=<ISO datetime>    -> range on created_at
+    Bad values raise ValidationError (400 in the API).
+    """
+    content_type = params.get('content_type')
+    if content_type:
+        try:
+            app_label, model = content_type.lower().split('.', 1)
+            queryset = queryset.filter(
+                content_type=ContentType.objects.get_by_natural_key(app_label, model)
+            )
+        except (ValueError, ContentType.DoesNotExist):
+            raise ValidationError({'content_type': "Use '<app_label>.<model>', e.g. 'inventory.asset'."})
+
+    if params.get('object_id'):
+        queryset = queryset.filter(object_id=params['object_id'])
+    if params.get('action'):
+        queryset = queryset.filter(action=params['action'].upper())
+
+    for param, lookup in (('since', 'created_at__gte'), ('until', 'created_at__lt')):
+        if params.get(param):
+            value = parse_datetime(params[param])
+            if value is None:
+                raise ValidationError({param: "Expected an ISO 8601 datetime."})
+            queryset = queryset.filter(**{lookup: value})
+
+    return queryset
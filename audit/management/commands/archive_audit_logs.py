@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from audit.archive import archive_audit_logs, rebuild_object_indexes
+
+
+class Command(BaseCommand):
+    help = "Move audit log rows older than the retention window into compressed archive segments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            help="Archive rows older than this many days (default: AUDIT_ARCHIVE['RETENTION_DAYS']).")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the rows that would be archived.")
+        parser.add_argument('--reindex', action='store_true',
+                            help="Only rebuild the per-object indexes from the segment sidecars.")
+
+    def handle(self, *args, **options):
+        if options['reindex']:
+            segments = rebuild_object_indexes()
+            self.stdout.write(self.style.SUCCESS(f"Indexed {segments} archive segments."))
+            return
+        count = archive_audit_logs(older_than_days=options['days'], dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"{count} audit rows would be archived.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Archived {count} audit rows."))
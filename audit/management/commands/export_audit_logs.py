@@ -0,0 +1,44 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+from audit.exports import AUDIT_EXPORT_COLUMNS, audit_export_queryset
+from audit.filters import filter_audit_logs
+from audit.models import AuditLog
+from common.exporters import EXPORT_FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream audit log rows to a CSV or JSONL file (memory use does not grow with the row count)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Output file, or '-' for stdout.")
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true', help="Compress the output (implied by a .gz path).")
+        parser.add_argument('--content-type', help="e.g. inventory.asset")
+        parser.add_argument('--object-id')
+        parser.add_argument('--action', help="e.g. ASSIGNED")
+        parser.add_argument('--since', help="ISO 8601 datetime (inclusive).")
+        parser.add_argument('--until', help="ISO 8601 datetime (exclusive).")
+        parser.add_argument('--chunk-size', type=int, help="Rows per cursor fetch (default: EXPORT_CHUNK_SIZE).")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        params = {key: options[key] for key in ('content_type', 'object_id', 'action', 'since', 'until')}
+        try:
+            queryset = filter_audit_logs(AuditLog.objects.all(), params)
+        except ValidationError as exc:
+            raise CommandError(' '.join(f"--{key.replace('_', '-')}: {message}" for key, message in exc.detail.items()))
+
+        chunks = iter_export(
+            audit_export_queryset(queryset), AUDIT_EXPORT_COLUMNS, options['format'],
+            compress=options['gzip'] or path.endswith('.gz'),
+            chunk_size=options['chunk_size'],
+        )
+        if path == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+        with open(path, 'wb') as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported audit logs to {path}."))
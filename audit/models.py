@@ -6,13 +6,24 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from common.models import TimeStampedModel
 
+class AuditLogQuerySet(models.QuerySet):
+    def for_object(self, instance):
+        """
+        History of one object, newest first. Served by auditlog_object_idx.
+        """
+        return self.filter(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=str(instance.pk),
+        ).order_by('-created_at', '-id')
+
 class AuditLog(TimeStampedModel):
     """
     The 'Ghost' Log.
     Uses GenericForeignKey to track any model (Assets, Users, etc.).
     """
     # Polymorphic Fields (The Magic)
-    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    # No single-column index: auditlog_object_idx starts with content_type
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, db_index=False)
     object_id = models.CharField(max_length=50) # Using Char to support UUIDs
     content_object = GenericForeignKey('content_type', 'object_id')
 
@@ -20,5 +31,17 @@ class AuditLog(TimeStampedModel):
     action = models.CharField(max_length=50) # e.g. "CREATED", "UPDATED"
     changes = models.JSONField(null=True, blank=True) # Store what changed (Old vs New)
 
+    objects = AuditLogQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Backs cursor paging on -created_at for /api/audit/
+            models.Index(fields=['created_at', 'id'], name='auditlog_created_id_idx'),
+            # "History of object X" (+ time range), without scanning the table
+            models.Index(fields=['content_type', 'object_id', 'created_at'], name='auditlog_object_idx'),
+            # "All ASSIGNED events last week"
+            models.Index(fields=['action', 'created_at'], name='auditlog_action_idx'),
+        ]
+
     def __str__(self):
         return f"{self.action} - {self.content_object}"
\ No newline at end of file
@@ -1,26 +1,64 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from inventory.models import Asset
+from inventory.signals import assets_bulk_created, assets_bulk_updated
 from audit.models import AuditLog
+from audit.writer import audit_writer
 from django.contrib.contenttypes.models import ContentType
 
+def action_for_status(status):
+    """
+    Logic to determine specific actions (Assignment/Return) from the new status.
+    """
+    if status == 'ASSIGNED':
+        return "ASSIGNED"
+    if status == 'AVAILABLE':
+        return "RETURNED"
+    return "UPDATED"
+
 @receiver(post_save, sender=Asset)
 def log_asset_change(sender, instance, created, **kwargs):
     """
     Automatically creates an AuditLog entry whenever an Asset is saved.
+    The entry goes through audit_writer (see AUDIT_LOG['MODE'] in settings).
     """
-    action = "CREATED" if created else "UPDATED"
-    
-    # Logic to determine specific actions (Assignment/Return)
-    if not created:
-        if instance.status == 'ASSIGNED':
-             action = "ASSIGNED"
-        elif instance.status == 'AVAILABLE':
-             action = "RETURNED"
+    action = "CREATED" if created else action_for_status(instance.status)
 
-    AuditLog.objects.create(
+    audit_writer.record([AuditLog(
         content_type=ContentType.objects.get_for_model(instance),
         object_id=instance.id,
         action=action,
         changes={"status": instance.status} 
-    )
\ No newline at end of file
+    )])
+
+@receiver(assets_bulk_created, sender=Asset)
+def log_assets_bulk_created(sender, assets, **kwargs):
+    """
+    Bulk imports skip post_save, so write their CREATED entries in one batch.
+    """
+    content_type = ContentType.objects.get_for_model(Asset)
+    audit_writer.record([
+        AuditLog(
+            content_type=content_type,
+            object_id=asset.id,
+            action="CREATED",
+            changes={"status": asset.status},
+        )
+        for asset in assets
+    ])
+
+@receiver(assets_bulk_updated, sender=Asset)
+def log_assets_bulk_updated(sender, changes, **kwargs):
+    """
+    Same entries log_asset_change would write, for set-based status updates.
+    """
+    content_type = ContentType.objects.get_for_model(Asset)
+    audit_writer.record([
+        AuditLog(
+            content_type=content_type,
+            object_id=change.asset_id,
+            action=action_for_status(change.new_status),
+            changes={"status": change.new_status},
+        )
+        for change in changes
+    ])
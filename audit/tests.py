@@ -1,3 +1,185 @@
-from django.test import TestCase
+from datetime import timedelta
+import io
+import json
+from pathlib import Path
+import shutil
+from unittest import mock
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from common.testing import TempDirMixin
+from inventory.models import Asset, Category
+from users.models import User
+from .archive import archive_audit_logs, OBJECTS_DIR, read_archived_history
+from .models import AuditLog
+from .writer import audit_writer, AuditWriter
 
-# Create your tests here.
+
+class AuditWriterTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Laptops")
+
+    def _create_assets(self, count, prefix="SN"):
+        for i in range(count):
+            Asset.objects.create(name=f"Laptop {i}", serial_number=f"{prefix}-{i}", category=self.category)
+
+    def test_on_commit_writes_one_batch_per_transaction(self):
+        flushes = audit_writer.stats()['flushes']
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self._create_assets(3)
+                self.assertEqual(AuditLog.objects.count(), 0)
+
+        self.assertEqual(audit_writer.stats()['flushes'], flushes + 1)
+        self.assertEqual(AuditLog.objects.filter(action="CREATED").count(), 3)
+
+    def test_rolled_back_work_is_not_audited(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self._create_assets(1, prefix="KEEP")
+                try:
+                    with transaction.atomic():
+                        self._create_assets(2, prefix="DROP")
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    @override_settings(AUDIT_LOG={'MODE': 'buffered', 'BATCH_SIZE': 3, 'FLUSH_INTERVAL': 60})
+    def test_buffered_mode_flushes_at_batch_size(self):
+        writer = AuditWriter()
+        entry = lambda: AuditLog(content_type_id=1, object_id="1", action="UPDATED")
+
+        with mock.patch.object(writer, '_start_flusher'):
+            writer.record([entry(), entry()])
+            self.assertEqual(writer.stats()['queue_depth'], 2)
+            self.assertEqual(AuditLog.objects.count(), 0)
+
+            writer.record([entry()])
+
+        stats = writer.stats()
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['written'], 3)
+        self.assertEqual(stats['flushes'], 1)
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+
+class AuditLogFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser(email='admin@test.com', password='x'))
+        category = Category.objects.create(name="Laptops")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.asset = Asset.objects.create(name="Laptop", serial_number="SN-1", category=category)
+            Asset.objects.create(name="Phone", serial_number="SN-2", category=category)
+            self.asset.status = Asset.Status.BROKEN
+            self.asset.save()
+
+    def test_filter_by_object_and_action(self):
+        response = self.client.get('/api/audit/', {
+            'content_type': 'inventory.asset', 'object_id': str(self.asset.id),
+        })
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get('/api/audit/', {'action': 'created'})
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_time_range_and_bad_input(self):
+        response = self.client.get('/api/audit/', {'since': '2999-01-01T00:00:00Z'})
+        self.assertEqual(response.data['results'], [])
+
+        response = self.client.get('/api/audit/', {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/audit/', {'content_type': 'nope'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_streams_filtered_rows(self):
+        response = self.client.get('/api/audit/export/', {'action': 'created', 'file_format': 'jsonl'})
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['action'] for row in rows], ["CREATED", "CREATED"])
+        self.assertEqual(rows[0]['content_type'], "asset")
+
+
+class AuditArchiveTests(TempDirMixin, TestCase):
+    def setUp(self):
+        self.enable_settings(AUDIT_ARCHIVE={
+            'DIR': self.make_temp_dir(), 'RETENTION_DAYS': 30, 'BATCH_SIZE': 2, 'SEGMENT_MAX_ROWS': 100,
+        })
+
+        category = Category.objects.create(name="Laptops")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.asset = Asset.objects.create(name="Laptop", serial_number="SN-1", category=category)
+            Asset.objects.create(name="Phone", serial_number="SN-2", category=category)
+            self.asset.status = Asset.Status.BROKEN
+            self.asset.save()
+        # Everything but the latest entry falls outside the retention window
+        AuditLog.objects.filter(action="CREATED").update(created_at=timezone.now() - timedelta(days=90))
+
+    def test_archive_moves_old_rows_to_segments(self):
+        self.assertEqual(archive_audit_logs(), 2)
+        self.assertEqual(list(AuditLog.objects.values_list('action', flat=True)), ["UPDATED"])
+
+        content_type = ContentType.objects.get_for_model(Asset)
+        archived = read_archived_history(content_type.id, str(self.asset.id))
+        self.assertEqual([entry['action'] for entry in archived], ["CREATED"])
+
+    def test_history_reads_live_and_archived_rows(self):
+        archive_audit_logs()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email='employee@test.com', password='x'))
+        response = client.get(f'/api/assets/{self.asset.id}/history/')
+
+        self.assertEqual([row['action'] for row in response.data['results']], ["UPDATED", "CREATED"])
+
+    def _old_entries(self, count):
+        content_type = ContentType.objects.get_for_model(Asset)
+        for minutes in range(count):
+            entry = AuditLog.objects.create(
+                content_type=content_type, object_id=str(self.asset.id), action=f"OLD-{minutes}", changes={},
+            )
+            AuditLog.objects.filter(pk=entry.pk).update(
+                created_at=timezone.now() - timedelta(days=60, minutes=minutes),
+            )
+
+    def _history(self, url):
+        client = APIClient()
+        client.force_authenticate(User.objects.get_or_create(email='employee@test.com')[0])
+        actions = []
+        while url:
+            response = client.get(url)
+            self.assertLessEqual(len(response.data['results']), 2)
+            actions += [row['action'] for row in response.data['results']]
+            url = response.data['next']
+        return actions
+
+    def test_history_pages_through_the_archive(self):
+        self._old_entries(4)
+        archive_audit_logs()
+        actions = self._history(f'/api/assets/{self.asset.id}/history/?page_size=2')
+        self.assertEqual(actions, ["UPDATED", "OLD-0", "OLD-1", "OLD-2", "OLD-3", "CREATED"])
+
+    def test_rows_left_in_the_live_table_are_served_once(self):
+        self._old_entries(3)
+        with mock.patch('audit.archive._seal', side_effect=lambda segment: segment.close() or 0):
+            archive_audit_logs()  # Segment written, DELETE never ran
+        self.assertEqual(AuditLog.objects.filter(object_id=str(self.asset.id)).count(), 5)
+        actions = self._history(f'/api/assets/{self.asset.id}/history/?page_size=2')
+        self.assertEqual(actions, ["UPDATED", "OLD-0", "OLD-1", "OLD-2", "CREATED"])
+
+    def test_reads_use_the_object_index(self):
+        archive_audit_logs()
+        content_type = ContentType.objects.get_for_model(Asset)
+        with mock.patch.object(Path, 'glob', side_effect=AssertionError("globbed the archive")):
+            self.assertEqual(len(read_archived_history(content_type.id, str(self.asset.id))), 1)
+
+        # Archives written before per-object indexes existed
+        shutil.rmtree(Path(settings.AUDIT_ARCHIVE['DIR']) / OBJECTS_DIR)
+        self.assertEqual(read_archived_history(content_type.id, str(self.asset.id)), [])
+        call_command('archive_audit_logs', '--reindex', stdout=io.StringIO())
+        self.assertEqual(len(read_archived_history(content_type.id, str(self.asset.id))), 1)
@@ -1,10 +1,46 @@
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from common.exporters import EXPORT_FORMATS, export_response
+from users.permissions import IsAdmin
+from .exports import AUDIT_EXPORT_COLUMNS, audit_export_queryset
+from .filters import filter_audit_logs
 from .models import AuditLog
 from .serializers import AuditLogSerializer
 
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Optional filters (each one maps onto an index):
+    - ?content_type=inventory.asset&object_id=<id>  -> auditlog_object_idx
+    - ?action=ASSIGNED                              -> auditlog_action_idx
+    - ?since=<ISO datetime>&until=<ISO datetime>    -> range on created_at
+    """
     queryset = AuditLog.objects.all().order_by('-created_at')
-    serializer_class = AuditLogSerializer
\ No newline at end of file
+    serializer_class = AuditLogSerializer
+
+    def get_queryset(self):
+        return filter_audit_logs(super().get_queryset(), self.request.query_params)
+
+    # === Custom Action: EXPORT ===
+    @action(detail=False, methods=['get'], url_path='export', permission_classes=[IsAdmin])
+    def export(self, request):
+        """
+        Streams every matching row as ?file_format=csv|jsonl (default csv), ?gzip=1 to compress.
+        Takes the same filters as the list endpoint.
+        """
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Unsupported format. Use one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return export_response(
+            audit_export_queryset(self.get_queryset()),
+            AUDIT_EXPORT_COLUMNS,
+            file_format,
+            filename='audit_logs',
+            compress=request.query_params.get('gzip') in ('1', 'true'),
+        )
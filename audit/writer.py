@@ -0,0 +1,193 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from django.conf import settings
+from django.db import connections, transaction
+from common.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Durability modes (settings.AUDIT_LOG['MODE'])
+SYNC = 'sync'            # INSERT right away, inside the caller's transaction
+ON_COMMIT = 'on_commit'  # One bulk INSERT per transaction, after it commits
+BUFFERED = 'buffered'    # In-process queue, flushed by size/time (best effort)
+MODES = (SYNC, ON_COMMIT, BUFFERED)
+
+DEFAULTS = {
+    'MODE': ON_COMMIT,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 2.0,  # seconds
+}
+
+
+def _config(key):
+    return getattr(settings, 'AUDIT_LOG', {}).get(key, DEFAULTS[key])
+
+
+class _Batch:
+    """
+    Entries collected inside one transaction (at one savepoint level).
+    """
+    def __init__(self, writer, savepoint_ids):
+        self.entries = []
+        self.savepoint_ids = savepoint_ids
+        self.callback = lambda: writer._write(self.entries)
+
+
+class AuditWriter:
+    """
+    Audit Pipeline:
+    Receivers hand over unsaved AuditLog objects and the writer decides when
+    they hit the database, depending on the durability mode:
+    - sync: written immediately (the old behaviour).
+    - on_commit: every entry of a transaction is written with one bulk_create
+      right after COMMIT. Rolled-back transactions write nothing.
+    - buffered: entries wait in memory and are flushed when BATCH_SIZE is
+      reached or FLUSH_INTERVAL has passed (and at exit). Fastest, but entries
+      still queued when a worker is killed are lost.
+    stats() exposes queue depth and flush latency.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flusher = None
+        self._metrics = {
+            'written': 0,
+            'failed': 0,
+            'flushes': 0,
+            'last_flush_seconds': 0.0,
+            'max_flush_seconds': 0.0,
+            'total_flush_seconds': 0.0,
+        }
+
+    @property
+    def mode(self):
+        mode = _config('MODE')
+        if mode not in MODES:
+            raise ValueError(f"AUDIT_LOG['MODE'] must be one of {MODES}, got '{mode}'.")
+        return mode
+
+    def record(self, entries):
+        entries = list(entries)
+        if not entries:
+            return
+        mode = self.mode
+        if mode == SYNC:
+            self._write(entries)
+        elif mode == ON_COMMIT:
+            self._add_to_transaction(entries)
+        else:
+            self._enqueue(entries)
+
+    def flush(self):
+        """
+        Writes everything waiting in the buffered queue.
+        """
+        with self._lock:
+            entries = list(self._queue)
+            self._queue.clear()
+            self._last_flush = time.monotonic()
+        if entries:
+            try:
+                self._write(entries)
+            except Exception:
+                with self._metrics_lock:
+                    self._metrics['failed'] += len(entries)
+                logger.exception("Dropped %d audit entries: flush failed.", len(entries))
+
+    def stats(self):
+        with self._metrics_lock:
+            stats = dict(self._metrics)
+        stats['mode'] = self.mode
+        stats['queue_depth'] = len(self._queue)
+        return stats
+
+    # --- on_commit mode ---
+    def _add_to_transaction(self, entries):
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            # Autocommit: there is nothing to wait for
+            self._write(entries)
+            return
+
+        # Reuse the batch of the current transaction, unless its callback was
+        # discarded by a rollback or we are now at another savepoint level.
+        savepoint_ids = tuple(connection.savepoint_ids)
+        batch = getattr(self._local, 'batch', None)
+        if (
+            batch is None
+            or batch.savepoint_ids != savepoint_ids
+            or not any(func is batch.callback for _, func, _ in connection.run_on_commit)
+        ):
+            batch = _Batch(self, savepoint_ids)
+            self._local.batch = batch
+            transaction.on_commit(batch.callback)
+        batch.entries.extend(entries)
+
+    # --- buffered mode ---
+    def _enqueue(self, entries):
+        with self._lock:
+            self._queue.extend(entries)
+            due = (
+                len(self._queue) >= _config('BATCH_SIZE')
+                or time.monotonic() - self._last_flush >= _config('FLUSH_INTERVAL')
+            )
+        self._start_flusher()
+        if due:
+            self.flush()
+
+    def _start_flusher(self):
+        """
+        Background thread so a quiet worker still flushes within FLUSH_INTERVAL.
+        """
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_forever, name='audit-flusher', daemon=True)
+            self._flusher.start()
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(_config('FLUSH_INTERVAL'))
+            if self._queue:
+                self.flush()
+                connections.close_all()  # This thread's own connections
+
+    # --- shared ---
+    def _write(self, entries):
+        from .models import AuditLog
+
+        started = time.perf_counter()
+        AuditLog.objects.bulk_create(entries, batch_size=_config('BATCH_SIZE'))
+        elapsed = time.perf_counter() - started
+
+        with self._metrics_lock:
+            metrics = self._metrics
+            metrics['written'] += len(entries)
+            metrics['flushes'] += 1
+            metrics['last_flush_seconds'] = elapsed
+            metrics['total_flush_seconds'] += elapsed
+            metrics['max_flush_seconds'] = max(metrics['max_flush_seconds'], elapsed)
+
+
+audit_writer = AuditWriter()
+atexit.register(audit_writer.flush)
+
+
+def _audit_samples():
+    stats = audit_writer.stats()
+    return [
+        ('techvault_audit_rows_written_total', {}, stats['written']),
+        ('techvault_audit_rows_failed_total', {}, stats['failed']),
+        ('techvault_audit_flushes_total', {}, stats['flushes']),
+    ]
+
+
+metrics.register_collector(_audit_samples)
@@ -0,0 +1,140 @@
+import hashlib
+import threading
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from .metrics import metrics
+
+KEY_PREFIX = 'response'
+
+
+class _PendingBumps:
+    """
+    Generation keys to bump again once the current transaction commits.
+    """
+    def __init__(self, response_cache):
+        self.response_cache = response_cache
+        self.keys = set()
+        self.callback = self.run  # Bound once, so on_commit can be checked by identity
+
+    def run(self):
+        for key in self.keys:
+            self.response_cache._bump(key)
+
+
+class ResponseCache:
+    """
+    Response Cache:
+    Stores serialized API payloads (response.data) in Django's cache framework
+    (settings.RESPONSE_CACHE['ALIAS'], locmem unless CACHES says otherwise).
+
+    Invalidation uses generation counters instead of deleting keys:
+    - every namespace (e.g. 'assets') has a list generation
+    - every object has its own generation
+    - every namespace also has an epoch, part of all of its keys
+    Keys embed the current generations, so bumping a counter makes the old
+    entries unreachable (they expire on their own). Writes bump only the
+    list generation and the generations of the objects they touched;
+    invalidate_all() bumps the epoch, for writes that do not know their rows.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+
+    @property
+    def cache(self):
+        return caches[settings.RESPONSE_CACHE['ALIAS']]
+
+    def _generations(self, keys):
+        # One round trip in the steady state
+        found = self.cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                self.cache.add(key, 1, timeout=None)
+                found[key] = self.cache.get(key, 1)
+        return [found[key] for key in keys]
+
+    def _bump(self, key):
+        try:
+            self.cache.incr(key)
+        except ValueError:  # Not set yet (or evicted)
+            self.cache.set(key, 2, timeout=None)
+
+    def make_key(self, namespace, request, object_id=None):
+        # Same parameters in a different order hit the same entry
+        params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+        raw = f"{request.get_host()}|{request.path}|{request.accepted_renderer.format}|{params}"
+        if object_id is None:
+            generation_key = f"{KEY_PREFIX}:{namespace}:list"
+        else:
+            generation_key = f"{KEY_PREFIX}:{namespace}:object:{object_id}"
+        epoch, generation = self._generations([f"{KEY_PREFIX}:{namespace}:epoch", generation_key])
+        return f"{KEY_PREFIX}:{namespace}:{epoch}.{generation}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def get(self, namespace, key):
+        data = self.cache.get(key)
+        self._count(namespace, 'hits' if data is not None else 'misses')
+        return data
+
+    def set(self, namespace, key, data):
+        self.cache.set(key, data, timeout=settings.RESPONSE_CACHE['TIMEOUT'])
+
+    def invalidate(self, namespace, object_ids=()):
+        """
+        Bumps the list generation and the generation of every given object.
+        Runs now and again after COMMIT, so a reader that cached the old rows
+        while the transaction was still open is not served afterwards.
+        The after-COMMIT bumps of one transaction are collected into a single callback.
+        """
+        keys = [f"{KEY_PREFIX}:{namespace}:list"]
+        keys += [f"{KEY_PREFIX}:{namespace}:object:{object_id}" for object_id in object_ids]
+        self._bump_keys(namespace, keys)
+
+    def invalidate_all(self, namespace):
+        """
+        Every list and object entry of the namespace, e.g. after a
+        QuerySet.update() whose rows are not known. Same timing as invalidate().
+        """
+        self._bump_keys(namespace, [f"{KEY_PREFIX}:{namespace}:epoch"])
+
+    def _bump_keys(self, namespace, keys):
+        for key in keys:
+            self._bump(key)
+        self._count(namespace, 'invalidations')
+
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            return
+        pending = getattr(self._local, 'pending', None)
+        if pending is None or not any(func is pending.callback for _, func, _ in connection.run_on_commit):
+            pending = _PendingBumps(self)
+            self._local.pending = pending
+            transaction.on_commit(pending.callback)
+        pending.keys.update(keys)
+
+    def _count(self, namespace, counter):
+        with self._lock:
+            stats = self._stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'invalidations': 0})
+            stats[counter] += 1
+
+    def stats(self):
+        """
+        Per-namespace hit/miss/invalidation counters of this process.
+        """
+        with self._lock:
+            return {namespace: dict(counters) for namespace, counters in self._stats.items()}
+
+
+response_cache = ResponseCache()
+
+
+def _cache_samples():
+    return [
+        ('techvault_cache_requests_total', {'cache': f'response:{namespace}', 'result': result}, counters[key])
+        for namespace, counters in response_cache.stats().items()
+        for key, result in (('hits', 'hit'), ('misses', 'miss'))
+    ]
+
+
+metrics.register_collector(_cache_samples)
@@ -0,0 +1,105 @@
+import csv
+import json
+import zlib
+from datetime import date, datetime
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+}
+FLUSH_BYTES = 64 * 1024  # Size of the chunks handed to the WSGI server
+
+
+class _LineBuffer:
+    """
+    File-like object for csv.writer: keeps the last written line only.
+    """
+    def write(self, value):
+        self.value = value
+
+
+def _csv_cell(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    return value
+
+
+def _encode_rows(rows, columns, file_format):
+    """
+    Yields one encoded line per row (plus the CSV header).
+    """
+    if file_format == 'csv':
+        buffer = _LineBuffer()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.value.encode()
+        for row in rows:
+            writer.writerow([_csv_cell(value) for value in row])
+            yield buffer.value.encode()
+    else:
+        encoder = DjangoJSONEncoder(separators=(',', ':'))
+        for row in rows:
+            yield (encoder.encode(dict(zip(columns, row))) + '\n').encode()
+
+
+def iter_export(queryset, columns, file_format, compress=False, chunk_size=None):
+    """
+    Streaming Export:
+    `columns` is a list of (header, lookup) pairs, e.g. ('category', 'category__name').
+    Rows are read with values_list().iterator(), i.e. a server-side cursor on
+    PostgreSQL fetching `chunk_size` rows at a time, and encoded line by line.
+    Output is grouped into ~64 KB chunks and optionally gzip'd on the fly, so
+    memory stays flat however many rows are exported.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{file_format}'.")
+    headers = [header for header, _ in columns]
+    rows = queryset.values_list(*[lookup for _, lookup in columns]).iterator(
+        chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE
+    )
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31 = gzip container
+
+    pending = []
+    pending_size = 0
+    for line in _encode_rows(rows, headers, file_format):
+        pending.append(line)
+        pending_size += len(line)
+        if pending_size >= FLUSH_BYTES:
+            chunk = b''.join(pending)
+            pending, pending_size = [], 0
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    chunk = b''.join(pending)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def export_response(queryset, columns, file_format, filename, compress=False):
+    """
+    Wraps iter_export() in a StreamingHttpResponse with a download filename.
+    """
+    filename = f"{filename}.{file_format}"
+    if compress:
+        response = StreamingHttpResponse(
+            iter_export(queryset, columns, file_format, compress=True),
+            content_type='application/gzip',
+        )
+        filename += '.gz'
+    else:
+        response = StreamingHttpResponse(
+            iter_export(queryset, columns, file_format),
+            content_type=CONTENT_TYPES[file_format],
+        )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
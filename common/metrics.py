@@ -0,0 +1,210 @@
+import bisect
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+# Upper bounds (seconds) of the request latency buckets; +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help) for every metric this project exports
+METRICS = {
+    'techvault_http_request_duration_seconds': ('histogram', "Request latency by URL name and method."),
+    'techvault_asset_transitions_total': ('counter', "Asset status changes by action."),
+    'techvault_audit_rows_written_total': ('counter', "Audit log rows written."),
+    'techvault_audit_rows_failed_total': ('counter', "Audit log rows that could not be written."),
+    'techvault_audit_flushes_total': ('counter', "Audit log batch INSERTs."),
+    'techvault_cache_requests_total': ('counter', "Cache lookups by cache and result (hit/miss)."),
+    'techvault_cache_hit_ratio': ('gauge', "Hits / lookups per cache, over all workers since start."),
+    'techvault_db_connections_opened_total': ('counter', "New database connections by alias."),
+    'techvault_db_connection_reuse_ratio': ('gauge', "1 - connections opened / requests served."),
+}
+
+
+def _key(name, labels):
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class MetricsRegistry:
+    """
+    Metrics Registry:
+    Counters and histograms of this process, kept in plain dicts.
+    - inc() / observe() update them; collectors (register_collector) report
+      counters other modules already keep, e.g. response_cache.stats().
+    - gunicorn runs several worker processes: each one writes its snapshot to
+      METRICS['DIR']/<pid>.json (at most every FLUSH_INTERVAL seconds), and
+      /metrics adds up all files. Empty the directory on deploy, as with
+      prometheus_client's multiprocess mode. Without a DIR only this process is reported.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collectors = []
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._counters = {}
+        self._histograms = {}  # key -> [count per bucket..., +Inf count, sum]
+        self._last_write = 0.0
+
+    def _check_fork(self):
+        # A forked worker starts from the parent's numbers; those belong to the parent
+        if os.getpid() != self._pid:
+            self._reset()
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._check_fork()
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._check_fork()
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+            histogram[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+            histogram[-1] += value
+
+    def register_collector(self, collector):
+        """
+        `collector()` returns [(name, labels_dict, value)] counters, read at snapshot time.
+        """
+        self._collectors.append(collector)
+
+    def snapshot(self):
+        with self._lock:
+            self._check_fork()
+            counters = dict(self._counters)
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                key = _key(name, labels)
+                counters[key] = counters.get(key, 0) + value
+        return {
+            'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+            'histograms': [[name, labels, values] for (name, labels), values in histograms.items()],
+        }
+
+    def write_snapshot(self, force=False):
+        directory = settings.METRICS['DIR']
+        now = time.monotonic()
+        if not directory or (not force and now - self._last_write < settings.METRICS['FLUSH_INTERVAL']):
+            return
+        self._last_write = now
+        os.makedirs(directory, exist_ok=True)
+        # Write + rename, so a scrape never reads half a file
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as temp_file:
+            json.dump(self.snapshot(), temp_file)
+        os.replace(temp_path, os.path.join(directory, f'{os.getpid()}.json'))
+
+    def collect(self):
+        """
+        Snapshots of every worker (or just this process), added up.
+        """
+        directory = settings.METRICS['DIR']
+        if directory:
+            self.write_snapshot(force=True)
+            snapshots = []
+            for path in glob.glob(os.path.join(directory, '*.json')):
+                try:
+                    with open(path) as handle:
+                        snapshots.append(json.load(handle))
+                except (OSError, ValueError):
+                    continue  # Removed or replaced while we were reading it
+        else:
+            snapshots = [self.snapshot()]
+
+        counters, histograms = {}, {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, values in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                total = histograms.setdefault(key, [0] * len(values))
+                for index, value in enumerate(values):
+                    total[index] += value
+        return counters, histograms
+
+    def render(self):
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        counters, histograms = self.collect()
+        samples = {}  # name -> [line, ...]
+        for (name, labels), value in sorted(counters.items()):
+            samples.setdefault(name, []).append(f'{name}{_labels(labels)} {_number(value)}')
+
+        requests = 0
+        for (name, labels), values in sorted(histograms.items()):
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), values[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labels + (("le", str(bound)),))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(values[-1])}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+            requests += cumulative
+
+        for (name, labels), value in sorted(_derived(counters, requests).items()):
+            samples.setdefault(name, []).append(f'{name}{_labels(labels)} {_number(value)}')
+
+        output = []
+        for name, lines in samples.items():
+            metric_type, help_text = METRICS.get(name, ('untyped', ''))
+            output += [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}', *lines]
+        return '\n'.join(output) + '\n'
+
+
+def _derived(counters, requests):
+    """
+    Ratios computed from the added-up counters.
+    """
+    derived = {}
+    lookups = {}
+    for (name, labels), value in counters.items():
+        if name == 'techvault_cache_requests_total':
+            labels = dict(labels)
+            totals = lookups.setdefault(labels['cache'], {'hit': 0, 'miss': 0})
+            totals[labels['result']] += value
+    for cache, totals in lookups.items():
+        if totals['hit'] + totals['miss']:
+            ratio = totals['hit'] / (totals['hit'] + totals['miss'])
+            derived[('techvault_cache_hit_ratio', (('cache', cache),))] = ratio
+
+    opened = sum(value for (name, _), value in counters.items() if name == 'techvault_db_connections_opened_total')
+    if requests:
+        derived[('techvault_db_connection_reuse_ratio', ())] = max(0.0, 1 - opened / requests)
+    return derived
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (key, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+metrics = MetricsRegistry()
+
+
+def count_new_connection(sender, connection, **kwargs):
+    metrics.inc('techvault_db_connections_opened_total', alias=connection.alias)
+
+
+connection_created.connect(count_new_connection)
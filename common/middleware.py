@@ -0,0 +1,182 @@
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from types import SimpleNamespace
+from django.conf import settings
+from django.db import connections
+from rest_framework.exceptions import APIException
+from users.authentication import CachedJWTAuthentication
+from users.permissions import IsAdmin
+from .metrics import metrics
+from .profiling import run_profiled
+
+logger = logging.getLogger('techvault.sql')
+
+# IN (%s, %s, %s) lists of any length count as the same statement
+IN_LIST = re.compile(r'\((?:%s, )*%s\)')
+
+
+def fingerprint(sql):
+    """
+    Statement shape: Django passes parameters separately, so only the
+    placeholder lists need collapsing.
+    """
+    return IN_LIST.sub('(...)', sql)
+
+
+class QueryRecorder:
+    """
+    execute_wrapper() hook: counts the statements of one request and times
+    them. Keeps the SQL text (with placeholders, no parameter values), never
+    the results.
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()  # sql -> executions
+        self.timings = {}            # sql -> slowest execution (seconds)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            self.statements[sql] += 1
+            if elapsed > self.timings.get(sql, 0.0):
+                self.timings[sql] = elapsed
+
+    def slowest(self, limit):
+        ranked = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [{'sql': sql, 'ms': round(elapsed * 1000, 2)} for sql, elapsed in ranked]
+
+    def duplicates(self, minimum):
+        """
+        [(fingerprint, executions)] of statements run at least `minimum` times (N+1 suspects).
+        """
+        shapes = Counter()
+        for sql, executions in self.statements.items():
+            shapes[fingerprint(sql)] += executions
+        return [(shape, executions) for shape, executions in shapes.most_common() if executions >= minimum]
+
+
+class MetricsMiddleware:
+    """
+    Request latency histogram for /metrics, labelled with the URL name
+    (e.g. 'asset-list', 'asset-checkout', 'dashboard'), so ids in the path do
+    not create a new series per asset.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        metrics.observe(
+            'techvault_http_request_duration_seconds', time.perf_counter() - started,
+            view=match.view_name if match else 'unmatched', method=request.method,
+        )
+        metrics.write_snapshot()  # Throttled to METRICS['FLUSH_INTERVAL']
+        return response
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Per-Request SQL Instrumentation (settings.SQL_INSTRUMENTATION):
+    - Server-Timing header: db (SQL time, query count), app (everything else), total;
+      only for IsAdmin users, or for everyone when DEBUG is on
+    - Slow request log ('techvault.sql' logger, one JSON object per line) when a
+      request takes SLOW_REQUEST_MS, runs SLOW_QUERY_COUNT queries, or repeats
+      one statement DUPLICATE_QUERY_COUNT times.
+    Overhead is two perf_counter() calls and a dict update per query. Queries
+    run while a streaming response is being sent are not counted.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = settings.SQL_INSTRUMENTATION
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():  # Per-thread objects: only this request is recorded
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        # The view has run: request.user is the user DRF authenticated (JWT included),
+        # or missing if a middleware above AuthenticationMiddleware answered (e.g. WhiteNoise)
+        user = getattr(request, 'user', None)
+        if config['HEADER'] and (settings.DEBUG or IsAdmin().has_permission(SimpleNamespace(user=user), None)):
+            db_ms, total_ms = recorder.duration * 1000, total * 1000
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+                f'app;dur={total_ms - db_ms:.1f}, total;dur={total_ms:.1f}'
+            )
+
+        minimum = config['DUPLICATE_QUERY_COUNT']
+        duplicates = recorder.duplicates(minimum) if recorder.count >= minimum else []
+        if total * 1000 >= config['SLOW_REQUEST_MS'] or recorder.count >= config['SLOW_QUERY_COUNT'] or duplicates:
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 1),
+                'db_ms': round(recorder.duration * 1000, 1),
+                'queries': recorder.count,
+                'slowest': recorder.slowest(config['TOP_STATEMENTS']),
+                'duplicates': [
+                    {'sql': shape, 'count': executions}
+                    for shape, executions in duplicates[:config['TOP_STATEMENTS']]
+                ],
+            }))
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in Sampling Profiler (settings.PROFILING, see common/profiling.py):
+    profiles the view, serializers and template rendering of a request when
+    - an IsAdmin user sends the PROFILING['HEADER'] header (e.g. X-Profile: 1), or
+    - random() < PROFILING['SAMPLE_RATE'] (0 = off).
+    The response then carries X-Profile-Id; download the collapsed stacks
+    from /api/profiles/<id>/. Requests that are not profiled only pay for the checks.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = settings.PROFILING
+        header = request.headers.get(config['HEADER'])
+        sampled = config['SAMPLE_RATE'] > 0 and random.random() < config['SAMPLE_RATE']
+        if config['ENABLED'] and (sampled or (header and self._is_admin(request))):
+            return run_profiled(self.get_response, request)
+        return self.get_response(request)
+
+    @staticmethod
+    def _is_admin(request):
+        """
+        IsAdmin for session users (dashboard) and JWT users (API); the API
+        authenticates inside DRF, after middleware, so check the token here.
+        """
+        user = request.user
+        if not user.is_authenticated:
+            try:
+                authenticated = CachedJWTAuthentication().authenticate(request)
+            except APIException:
+                return False
+            if authenticated is None:
+                return False
+            user = authenticated[0]
+        return IsAdmin().has_permission(SimpleNamespace(user=user), None)
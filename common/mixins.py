@@ -0,0 +1,111 @@
+import hashlib
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date
+from rest_framework.response import Response
+from .cache import response_cache
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET for list/retrieve (ETag + Last-Modified, 304 Not Modified).
+    Validators come from one cheap query instead of serializing the response:
+    - list: COUNT + MAX of every field in `conditional_fields` over the filtered queryset (ETag only)
+    - retrieve: the values of `conditional_fields` for that one row (ETag + Last-Modified)
+    `conditional_fields` are `updated_at` lookups; add related ones
+    (e.g. 'assigned_to__updated_at') for data nested in the response.
+    The ETag also covers the query string and the renderer (JSON vs browsable API).
+    """
+    conditional_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        aggregates = {}
+        for index, field in enumerate(self.conditional_fields):
+            aggregates[f'count_{index}'] = Count(field)
+            aggregates[f'max_{index}'] = Max(field)
+        values = queryset.order_by().aggregate(**aggregates)
+        # No Last-Modified here: deleting the newest row lowers MAX(updated_at),
+        # so only the ETag (which includes the counts) is a safe list validator
+        return self._conditional(request, values, None, super().list, args, kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            row = (
+                self.filter_queryset(self.get_queryset())
+                .filter(**{self.lookup_field: lookup})
+                .values_list(*self.conditional_fields)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            row = None
+        if row is None:
+            # Let the normal code path produce the 404
+            return super().retrieve(request, *args, **kwargs)
+        timestamps = [value for value in row if value is not None]
+        last_modified = int(max(timestamps).timestamp()) if timestamps else None
+        return self._conditional(request, row, last_modified, super().retrieve, args, kwargs)
+
+    def _conditional(self, request, validators, last_modified, handler, args, kwargs):
+        raw = f"{request.accepted_renderer.format}|{request.get_full_path()}|{validators}"
+        etag = f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ResponseCacheMixin:
+    """
+    Caches the serialized payload of list/retrieve in `response_cache`
+    under `cache_namespace`. Entries are invalidated by the model signal
+    receivers that call response_cache.invalidate(<namespace>, ...).
+    Responses carry X-Cache: HIT or MISS.
+    Put it before ConditionalGetMixin: the ETag/Last-Modified headers are cached
+    with the payload, so a hit (or a 304 for it) costs no query at all.
+    """
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        key = response_cache.make_key(self.cache_namespace, request)
+        return self._cached(key, super().list, request, args, kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            # Normalized, so '/ABC.../' and '/abc.../' share one entry and one generation
+            object_id = str(self.get_queryset().model._meta.pk.to_python(lookup))
+        except ValidationError:
+            return super().retrieve(request, *args, **kwargs)
+        key = response_cache.make_key(self.cache_namespace, request, object_id=object_id)
+        return self._cached(key, super().retrieve, request, args, kwargs)
+
+    def _cached(self, key, handler, request, args, kwargs):
+        entry = response_cache.get(self.cache_namespace, key)
+        if entry is not None:
+            # The cached validators are as fresh as the cached payload
+            last_modified = entry['headers'].get('Last-Modified')
+            not_modified = get_conditional_response(
+                request,
+                etag=entry['headers'].get('ETag'),
+                last_modified=parse_http_date(last_modified) if last_modified else None,
+            )
+            if not_modified is not None:
+                return not_modified
+            return Response(entry['data'], headers={**entry['headers'], 'X-Cache': 'HIT'})
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {name: response[name] for name in ('ETag', 'Last-Modified') if response.has_header(name)}
+            response_cache.set(self.cache_namespace, key, {'data': response.data, 'headers': headers})
+        response['X-Cache'] = 'MISS'
+        return response
@@ -1,4 +1,6 @@
+import copy
 from django.db import models
+from django.db.models.fields.files import FieldFile
 
 class TimeStampedModel(models.Model):
     """
@@ -9,4 +11,53 @@ class TimeStampedModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        abstract = True  # Crucial: Django won't create a table for this.
\ No newline at end of file
+        abstract = True  # Crucial: Django won't create a table for this.
+
+class DirtyFieldsMixin:
+    """
+    Remembers the field values an instance was loaded with, so save() can
+    tell which fields actually changed.
+    - get_dirty_fields(): names of the changed fields (all of them for new rows)
+    - The snapshot is refreshed after save() and refresh_from_db().
+    Fields that were deferred when loading count as changed once they are set.
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    def _take_snapshot(self, fields=None):
+        loaded = getattr(self, '_loaded_values', {})
+        for field in self._meta.concrete_fields:
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            if field.attname in self.__dict__:
+                loaded[field.attname] = self._comparable(self.__dict__[field.attname])
+        self._loaded_values = loaded
+
+    @staticmethod
+    def _comparable(value):
+        if isinstance(value, FieldFile):
+            return value.name
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)  # JSON values can be changed in place
+        return value
+
+    def get_dirty_fields(self):
+        if self._state.adding or not hasattr(self, '_loaded_values'):
+            return {field.name for field in self._meta.concrete_fields}
+        missing = object()
+        return {
+            field.name for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+            and self._loaded_values.get(field.attname, missing) != self._comparable(self.__dict__[field.attname])
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._take_snapshot(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._take_snapshot(fields)
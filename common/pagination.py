@@ -0,0 +1,82 @@
+import base64
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import CursorPagination
+
+
+def encode_keyset_cursor(instance):
+    """
+    Turns the (created_at, id) position of a row into an opaque URL-safe token.
+    """
+    return encode_position(instance.created_at.isoformat(), instance.pk)
+
+
+def encode_position(created_at, pk):
+    """
+    Same token from an ISO 8601 timestamp and a pk, for rows that are not
+    model instances (e.g. archived audit entries).
+    """
+    raw = f"{created_at}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_keyset_cursor(cursor):
+    """
+    Returns (created_at, id) or None if the token is missing or tampered with.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, pk = raw.split('|', 1)
+    except (ValueError, UnicodeError):
+        return None
+    created_at = parse_datetime(created_at)
+    if created_at is None or not pk:
+        return None
+    return created_at, pk
+
+
+def keyset_page(queryset, cursor=None, page_size=50):
+    """
+    Keyset ("seek") Pagination:
+    Orders by (-created_at, -id) and continues strictly after the cursor
+    position, so every page is an index range scan + LIMIT no matter how
+    deep we are (no OFFSET).
+    Returns (rows, next_cursor). next_cursor is None on the last page.
+    """
+    queryset = queryset.order_by('-created_at', '-pk')
+    position = decode_keyset_cursor(cursor)
+    if position:
+        created_at, pk = position
+        try:
+            pk = queryset.model._meta.pk.to_python(pk)
+        except ValidationError:
+            pk = None
+    if position and pk is not None:
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+
+    # Fetch one extra row to know whether there is a next page
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_keyset_cursor(rows[-1])
+    return rows, next_cursor
+
+
+class BoundedCursorPagination(CursorPagination):
+    """
+    Default paginator for every API list endpoint.
+    Cursor paging seeks on the ordering columns instead of using OFFSET, so
+    page N costs the same as page 1 and rows inserted while a client is paging
+    do not shift or duplicate results.
+    Clients may ask for ?page_size= up to API_MAX_PAGE_SIZE.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
@@ -0,0 +1,138 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from django.conf import settings
+from django.utils import timezone
+
+# Profile ids are generated here; anything else in a download URL is rejected
+PROFILE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _config(key):
+    return settings.PROFILING[key]
+
+
+def collapse(frame):
+    """
+    'module.function;module.function;...' from the outermost call to `frame`
+    (the "collapsed stacks" format flamegraph.pl and speedscope read).
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        name = getattr(code, 'co_qualname', code.co_name)  # co_qualname is Python 3.11+
+        names.append(f"{frame.f_globals.get('__name__', '?')}.{name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """
+    Sampling Profiler:
+    A background thread looks at the profiled thread's current stack every
+    `interval` seconds and counts each distinct stack. Unlike cProfile, the
+    profiled code runs unmodified, so the cost is the same for a view that
+    makes a million calls or ten.
+    """
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def profile_path(profile_id, suffix):
+    return os.path.join(_config('DIR'), f'{profile_id}.{suffix}')
+
+
+def save_profile(sampler, request, response, duration):
+    """
+    Writes <id>.folded (collapsed stacks) and <id>.json (what was profiled),
+    then drops the oldest profiles beyond PROFILING['MAX_FILES'].
+    """
+    profile_id = uuid.uuid4().hex
+    os.makedirs(_config('DIR'), exist_ok=True)
+    with open(profile_path(profile_id, 'folded'), 'w') as handle:
+        handle.write(sampler.collapsed())
+    match = getattr(request, 'resolver_match', None)
+    info = {
+        'id': profile_id,
+        'created_at': timezone.now().isoformat(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 1),
+        'samples': sum(sampler.stacks.values()),
+        'interval_ms': sampler.interval * 1000,
+    }
+    with open(profile_path(profile_id, 'json'), 'w') as handle:
+        json.dump(info, handle)
+    _prune()
+    return profile_id
+
+
+def _prune():
+    infos = sorted(
+        (entry for entry in os.scandir(_config('DIR')) if entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime, reverse=True,
+    )
+    for entry in infos[_config('MAX_FILES'):]:
+        for suffix in ('json', 'folded'):
+            try:
+                os.remove(profile_path(entry.name[:-len('.json')], suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    """
+    Metadata of the stored profiles, newest first.
+    """
+    directory = _config('DIR')
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.json'):
+            try:
+                with open(entry.path) as handle:
+                    profiles.append(json.load(handle))
+            except (OSError, ValueError):
+                continue  # Pruned or still being written
+    return sorted(profiles, key=lambda info: info['created_at'], reverse=True)
+
+
+def run_profiled(get_response, request):
+    """
+    Runs the rest of the request under a StackSampler and stores the profile.
+    """
+    started = time.perf_counter()
+    with StackSampler(threading.get_ident(), _config('INTERVAL')) as sampler:
+        response = get_response(request)
+    profile_id = save_profile(sampler, request, response, time.perf_counter() - started)
+    response['X-Profile-Id'] = profile_id
+    return response
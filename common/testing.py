@@ -0,0 +1,19 @@
+import tempfile
+from django.test import override_settings
+
+
+class TempDirMixin:
+    """
+    Test case helpers for code that writes files (media, archives, profiles):
+    - make_temp_dir(): a fresh directory, removed after the test
+    - enable_settings(**overrides): override_settings for the rest of the test
+    """
+    def make_temp_dir(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return directory.name
+
+    def enable_settings(self, **overrides):
+        settings_override = override_settings(**overrides)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
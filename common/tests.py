@@ -1,3 +1,164 @@
-from django.test import TestCase
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from common.testing import TempDirMixin
+from inventory.models import Asset, Category
+from users.authentication import RoleTokenObtainPairSerializer
+from users.models import User
+from .metrics import metrics
+from .middleware import QueryRecorder
+from .profiling import collapse, StackSampler
 
-# Create your tests here.
+
+class SQLInstrumentationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+
+    def test_server_timing_header(self):
+        # The header is added after the view, so it sees the user DRF authenticated from the JWT
+        self.client.force_authenticate(user=None)
+        token = RoleTokenObtainPairSerializer.get_token(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get(reverse('category-list'))
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.-]+, total;dur=[\d.]+$',
+        )
+
+    def test_server_timing_hidden_from_anonymous_clients(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('dashboard'))  # Redirects to the login page
+        self.assertNotIn('Server-Timing', response)
+        with override_settings(DEBUG=True):
+            self.assertIn('Server-Timing', self.client.get(reverse('dashboard')))
+
+    def test_slow_request_log(self):
+        config = {**settings.SQL_INSTRUMENTATION, 'SLOW_REQUEST_MS': 10 ** 6, 'SLOW_QUERY_COUNT': 1}
+        with override_settings(SQL_INSTRUMENTATION=config), self.assertLogs('techvault.sql', 'WARNING') as logs:
+            self.client.get(reverse('inventory-stats'))
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['event'], 'slow_request')
+        self.assertEqual(entry['path'], reverse('inventory-stats'))
+        self.assertGreaterEqual(entry['queries'], 1)
+        self.assertTrue(entry['slowest'][0]['sql'].startswith('SELECT'))
+
+    def test_repeated_statements_are_grouped(self):
+        recorder = QueryRecorder()
+        execute = lambda sql, params, many, context: None
+        for ids in ([1], [1, 2], [1, 2, 3]):
+            recorder(execute, f"SELECT * FROM t WHERE id IN ({', '.join(['%s'] * len(ids))})", ids, False, {})
+        recorder(execute, "SELECT * FROM u", [], False, {})
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual(recorder.duplicates(3), [('SELECT * FROM t WHERE id IN (...)', 3)])
+
+
+class MetricsTests(TempDirMixin, APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+
+    def scrape(self):
+        self.client.force_login(self.admin)  # /metrics is a plain Django view: session login
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_latency_histogram_per_url_name(self):
+        self.client.get(reverse('category-list'))
+        body = self.scrape()
+        self.assertIn('# TYPE techvault_http_request_duration_seconds histogram', body)
+        self.assertRegex(body, r'techvault_http_request_duration_seconds_bucket\{method="GET",view="category-list",le="\+Inf"\} [1-9]')
+        self.assertIn('techvault_cache_requests_total{cache="response:categories",result="miss"}', body)
+
+    def test_transitions_are_counted_after_commit(self):
+        asset = Asset.objects.create(name="Laptop", serial_number="SN-1", category=Category.objects.create(name="Laptops"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('asset-checkout', args=[asset.id]), {'employee_id': self.admin.id}, format='json')
+        self.assertRegex(
+            self.scrape(),
+            r'techvault_asset_transitions_total\{action="checkout",from_status="AVAILABLE",to_status="ASSIGNED"\} [1-9]',
+        )
+
+    def test_worker_snapshots_are_added_up(self):
+        directory = self.make_temp_dir()
+        other_worker = {
+            'counters': [['techvault_audit_flushes_total', [], 1000]],
+            'histograms': [],
+        }
+        with open(os.path.join(directory, '1.json'), 'w') as handle:
+            json.dump(other_worker, handle)
+
+        own = dict(metrics.collect()[0]).get(('techvault_audit_flushes_total', ()), 0)
+        with override_settings(METRICS={**settings.METRICS, 'DIR': directory}):
+            self.assertIn(f'techvault_audit_flushes_total {own + 1000}', self.scrape())
+
+    def test_token(self):
+        with override_settings(METRICS={**settings.METRICS, 'TOKEN': 'secret'}):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+            self.assertEqual(response.status_code, 401)
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+            self.assertEqual(response.status_code, 200)
+
+    def test_closed_without_token(self):
+        employee = User.objects.create_user(email='employee@test.com', password='password123')
+        with override_settings(METRICS={**settings.METRICS, 'TOKEN': None}):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+            self.client.force_login(employee)
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+            self.client.force_login(self.admin)
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+
+class ProfilingTests(TempDirMixin, APITestCase):
+    def setUp(self):
+        self.enable_settings(PROFILING={**settings.PROFILING, 'DIR': self.make_temp_dir(), 'INTERVAL': 0.001})
+        User.objects.create_superuser(email='admin@test.com', password='password123')
+        User.objects.create_user(email='employee@test.com', password='password123')
+
+    def login(self, email):
+        token = RoleTokenObtainPairSerializer.get_token(User.objects.get(email=email)).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_admin_header_profiles_request(self):
+        self.login('admin@test.com')
+        response = self.client.get(reverse('category-list'), HTTP_X_PROFILE='1')
+        profile_id = response['X-Profile-Id']
+
+        profiles = self.client.get(reverse('profile-list')).data
+        self.assertEqual(profiles[0]['id'], profile_id)
+        self.assertEqual(profiles[0]['view'], 'category-list')
+
+        download = self.client.get(reverse('profile-detail', args=[profile_id]))
+        self.assertEqual(download.status_code, 200)
+        for line in b''.join(download.streaming_content).decode().splitlines():
+            self.assertRegex(line, r'^\S+ \d+$')
+
+    def test_header_is_ignored_for_non_admins(self):
+        self.login('employee@test.com')
+        response = self.client.get(reverse('category-list'), HTTP_X_PROFILE='1')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(self.client.get(reverse('profile-list')).status_code, 403)
+
+    def test_sampler_collects_collapsed_stacks(self):
+        def busy_view():
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                pass
+
+        with StackSampler(threading.get_ident(), 0.001) as sampler:
+            busy_view()
+        self.assertTrue(any(stack.endswith('busy_view') for stack in sampler.stacks))
+
+    def test_collapse_without_co_qualname(self):
+        # Python 3.10 code objects have no co_qualname
+        outer = SimpleNamespace(f_globals={'__name__': 'app'}, f_code=SimpleNamespace(co_name='view'), f_back=None)
+        inner = SimpleNamespace(f_globals={'__name__': 'app'}, f_code=SimpleNamespace(co_name='helper'), f_back=outer)
+        self.assertEqual(collapse(inner), 'app.view;app.helper')
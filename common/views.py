@@ -1,3 +1,48 @@
-from django.shortcuts import render
+import hmac
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import viewsets
+from rest_framework.response import Response
+from users.permissions import IsAdmin
+from .metrics import metrics
+from .profiling import PROFILE_ID, list_profiles, profile_path
 
-# Create your views here.
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint: the metrics of every worker process, added up.
+    Closed by default. Scrapers send "Authorization: Bearer <METRICS['TOKEN']>";
+    IsAdmin users logged in to the dashboard may look too. Without a token
+    configured everyone else gets a 404, as if the endpoint did not exist.
+    """
+    token = settings.METRICS['TOKEN']
+    scraper = bool(token) and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not scraper and not IsAdmin().has_permission(request, None):
+        if not token:
+            raise Http404
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ProfileViewSet(viewsets.ViewSet):
+    """
+    Request profiles taken by ProfilingMiddleware (admins only).
+    - list: what was profiled, newest first
+    - retrieve: the collapsed stacks as a download, ready for flamegraph.pl
+      or speedscope.app
+    """
+    permission_classes = [IsAdmin]
+
+    def list(self, request):
+        return Response(list_profiles())
+
+    def retrieve(self, request, pk=None):
+        if not PROFILE_ID.match(pk or ''):
+            raise Http404
+        try:
+            handle = open(profile_path(pk, 'folded'), 'rb')
+        except FileNotFoundError:
+            raise Http404
+        return FileResponse(handle, as_attachment=True, filename=f'profile-{pk}.folded', content_type='text/plain')
@@ -59,12 +59,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'common.middleware.MetricsMiddleware',  # Outermost: times the whole request
     'django.middleware.security.SecurityMiddleware',
+    'common.middleware.SQLInstrumentationMiddleware',  # First, so it sees every query
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'common.middleware.ProfilingMiddleware',  # Needs request.user for the admin check
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -168,7 +171,7 @@ from datetime import timedelta
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated', # Lock everything by default
@@ -178,6 +181,8 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1), # Long time for dev convenience
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    # Tokens carry the user's role and is_active (see users/authentication.py)
+    'TOKEN_OBTAIN_SERIALIZER': 'users.authentication.RoleTokenObtainPairSerializer',
 }
 
 LOGIN_URL = 'login'
@@ -195,10 +200,86 @@ REST_FRAMEWORK = {
     
     # Keeping your existing JWT Authentication
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
+
+    # Cursor pagination on every list endpoint (see common/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'common.pagination.BoundedCursorPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '50')),
+}
+
+# Upper bound for ?page_size= on API list endpoints
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '500'))
+
+# Audit log writer (see audit/writer.py)
+# MODE: 'sync' | 'on_commit' | 'buffered'
+AUDIT_LOG = {
+    'MODE': os.getenv('AUDIT_LOG_MODE', 'on_commit'),
+    'BATCH_SIZE': int(os.getenv('AUDIT_LOG_BATCH_SIZE', '500')),
+    'FLUSH_INTERVAL': float(os.getenv('AUDIT_LOG_FLUSH_INTERVAL', '2.0')),
+}
+
+# Audit retention: rows older than RETENTION_DAYS are moved into gzip'd
+# monthly segment files under DIR by `manage.py archive_audit_logs`
+AUDIT_ARCHIVE = {
+    'DIR': os.getenv('AUDIT_ARCHIVE_DIR', os.path.join(BASE_DIR, 'audit_archive')),
+    'RETENTION_DAYS': int(os.getenv('AUDIT_RETENTION_DAYS', '365')),
+    'BATCH_SIZE': 5000,
+    'SEGMENT_MAX_ROWS': 100000,
+}
+
+# Asset search (see inventory/search.py). Leave the backend unset to pick
+# one by database vendor (pg_trgm on PostgreSQL, FTS5 on SQLite).
+ASSET_SEARCH_BACKEND = os.getenv('ASSET_SEARCH_BACKEND') or None
+
+# Cache backend: in-process locmem by default. Point CACHE_BACKEND/CACHE_LOCATION
+# at a shared one (e.g. django.core.cache.backends.redis.RedisCache) when
+# running several workers, so invalidations reach all of them.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# API response cache for the asset/category endpoints (see common/cache.py)
+RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300')),  # seconds
+}
+
+# Rows fetched per server-side cursor round trip by the streaming exports
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Uploads always stream to a temporary file instead of being held in memory
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
+# Resized WebP copies of uploaded asset images (see inventory/images.py)
+IMAGE_DERIVATIVES = {
+    'MODE': os.getenv('IMAGE_DERIVATIVES_MODE', 'thread'),  # 'thread' (after commit) | 'sync'
+    'WORKERS': 2,
+    'SIZES': {'thumb': (160, 160), 'medium': (640, 640)},  # Bounding boxes, aspect ratio is kept
+    'QUALITY': 80,
+}
+
+# QR codes and label sheets (see inventory/labels.py)
+QR_LABELS = {
+    'WORKERS': int(os.getenv('QR_WORKERS', '0')) or None,  # None = CPU count
+    'PAYLOAD': 'techvault:asset:{id}',  # What the code encodes ({id}, {serial_number})
+    'BOX_SIZE': 10,
+    'BORDER': 4,
+    'ERROR_CORRECTION': 'M',
+    # Sheet layout: US Letter, 3 x 10 labels (Avery 5160-like), 300 dpi
+    'PAGE_INCHES': (8.5, 11),
+    'MARGIN_INCHES': 0.5,
+    'COLUMNS': 3,
+    'ROWS': 10,
+    'DPI': 300,
 }
 
+# Upper bound for asset_ids in one bulk checkout/return/mark request
+BULK_ACTION_MAX_ASSETS = int(os.getenv('BULK_ACTION_MAX_ASSETS', '5000'))
+
 # Documentation Metadata
 SPECTACULAR_SETTINGS = {
     'TITLE': 'TechVault IT Asset Management API',
@@ -209,3 +290,65 @@ SPECTACULAR_SETTINGS = {
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Authenticated users cached per process, so API requests skip the user query
+# (see users/authentication.py). TTL bounds how long another worker process
+# can keep using a user that was changed elsewhere.
+AUTH_USER_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': int(os.getenv('AUTH_USER_CACHE_TTL', '60')),  # seconds
+}
+
+# Per-request SQL instrumentation (see common/middleware.py): Server-Timing
+# header plus a JSON log line on the 'techvault.sql' logger for slow requests
+SQL_INSTRUMENTATION = {
+    'ENABLED': os.getenv('SQL_INSTRUMENTATION', '1') == '1',
+    'HEADER': True,                 # Server-Timing for role=ADMIN users (every response when DEBUG)
+    'SLOW_REQUEST_MS': int(os.getenv('SLOW_REQUEST_MS', '500')),
+    'SLOW_QUERY_COUNT': 50,         # Queries per request
+    'DUPLICATE_QUERY_COUNT': 10,    # Same statement this often -> likely an N+1 loop
+    'TOP_STATEMENTS': 3,            # Statements listed per log line
+}
+
+# 'techvault.sql' gets its own handler: bare JSON lines on stderr, level set by
+# SQL_LOG_LEVEL (ERROR silences the slow request log)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json_line': {'format': '{message}', 'style': '{'},
+    },
+    'handlers': {
+        'sql': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json_line',
+        },
+    },
+    'loggers': {
+        'techvault.sql': {
+            'handlers': ['sql'],
+            'level': os.getenv('SQL_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Prometheus metrics at /metrics (see common/metrics.py). With several gunicorn
+# workers, point METRICS_DIR at a directory they share (emptied on deploy);
+# each worker writes its numbers there and /metrics adds them up.
+METRICS = {
+    'DIR': os.getenv('METRICS_DIR') or None,
+    'FLUSH_INTERVAL': 5.0,  # Seconds between a worker's snapshot writes
+    # Scrapes send "Authorization: Bearer <token>". Unset: only admins (dashboard login) can read it
+    'TOKEN': os.getenv('METRICS_TOKEN') or None,
+}
+
+# Sampling profiler for single requests (see common/profiling.py)
+PROFILING = {
+    'ENABLED': True,
+    'HEADER': 'X-Profile',  # Admins send "X-Profile: 1" to profile that request
+    'SAMPLE_RATE': float(os.getenv('PROFILING_SAMPLE_RATE', '0')),  # e.g. 0.001 = 1 request in 1000
+    'INTERVAL': 0.005,  # Seconds between stack samples
+    'DIR': os.getenv('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles')),
+    'MAX_FILES': 200,  # Oldest profiles are deleted beyond this
+}
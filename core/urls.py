@@ -10,8 +10,9 @@ from rest_framework_simplejwt.views import (
 )
 # Import Views
 from users.views import UserViewSet
-from inventory.views import AssetViewSet, CategoryViewSet
+from inventory.views import AssetViewSet, CategoryViewSet, InventoryStatsView
 from audit.views import AuditLogViewSet
+from common.views import ProfileViewSet, metrics_view
 
 
 # Create Router
@@ -20,9 +21,12 @@ router.register(r'users', UserViewSet)
 router.register(r'assets', AssetViewSet)
 router.register(r'categories', CategoryViewSet)
 router.register(r'audit', AuditLogViewSet)
+router.register(r'profiles', ProfileViewSet, basename='profile')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/stats/', InventoryStatsView.as_view(), name='inventory-stats'),
+    path('metrics', metrics_view, name='metrics'),  # Prometheus scrape target
     path('api/', include(router.urls)),
     
     # JWT Authentication Endpoints
@@ -0,0 +1,172 @@
+import platform
+import statistics
+import time
+import tracemalloc
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from common.cache import response_cache
+from users.authentication import RoleTokenObtainPairSerializer
+from .fleet import seed_fleet
+from .models import Asset
+
+FLEET_PREFIX = 'BENCH'
+WARMUP_REQUESTS = 2
+
+
+class BenchmarkRun:
+    """
+    Clients and asset pools shared by the scenarios of one fleet size.
+    Requests go through the full Django stack in-process (middleware, auth,
+    views, templates), but without a network socket in between.
+    """
+    def __init__(self, admin, requests):
+        self.admin = admin
+        self.requests = requests
+        self.web = Client()
+        self.web.force_login(admin)
+        self.api = APIClient()
+        token = RoleTokenObtainPairSerializer.get_token(admin).access_token
+        self.api.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # Checkout needs AVAILABLE assets; return gets the same ones back afterwards
+        needed = requests + WARMUP_REQUESTS + 1
+        self.available = list(
+            Asset.objects.filter(status=Asset.Status.AVAILABLE).values_list('id', flat=True)[:needed]
+        )
+        if len(self.available) < needed:
+            raise ValueError(f"Only {len(self.available)} AVAILABLE assets; the checkout scenario needs {needed}.")
+        self.checked_out = []
+        self.some_asset = Asset.objects.filter(serial_number__startswith=f'{FLEET_PREFIX}-').order_by('serial_number').first()
+
+
+# --- Scenarios: each one sends a single request and returns the response ---
+
+def dashboard(run):
+    return run.web.get(reverse('dashboard'))
+
+
+def api_assets_list(run):
+    response_cache.invalidate('assets')  # Measure the real list, not a cache hit
+    return run.api.get(reverse('asset-list'))
+
+
+def api_assets_list_cached(run):
+    return run.api.get(reverse('asset-list'))
+
+
+def api_assets_search(run):
+    response_cache.invalidate('assets')
+    return run.api.get(reverse('asset-list'), {'search': 'ThinkPad'})
+
+
+def api_checkout(run):
+    asset_id = run.available.pop()
+    run.checked_out.append(asset_id)
+    return run.api.post(reverse('asset-checkout', args=[asset_id]), {'employee_id': run.admin.id}, format='json')
+
+
+def api_return(run):
+    return run.api.post(reverse('asset-return-asset', args=[run.checked_out.pop()]))
+
+
+def audit_signal(run):
+    """
+    Asset.save() -> post_save -> log_asset_change -> audit_writer.
+    """
+    run.some_asset.name = f'Benchmark {time.perf_counter_ns()}'
+    run.some_asset.save(update_fields=['name'])
+
+
+SCENARIOS = {
+    'dashboard': dashboard,
+    'api_assets_list': api_assets_list,
+    'api_assets_list_cached': api_assets_list_cached,
+    'api_assets_search': api_assets_search,
+    'api_checkout': api_checkout,
+    'api_return': api_return,
+    'audit_signal': audit_signal,
+}
+
+
+def _percentiles(timings):
+    cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    return {'p50_ms': cuts[49], 'p95_ms': cuts[94], 'p99_ms': cuts[98]}
+
+
+def measure(scenario, run):
+    """
+    Latency of `run.requests` calls, then one more call under tracemalloc and
+    CaptureQueriesContext for the SQL query count and peak Python memory (kept
+    out of the timed calls because both slow them down).
+    """
+    for _ in range(WARMUP_REQUESTS):
+        scenario(run)
+
+    timings = []
+    errors = 0
+    for _ in range(run.requests):
+        started = time.perf_counter()
+        response = scenario(run)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response is not None and response.status_code >= 400:
+            errors += 1
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            scenario(run)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {key: round(value, 2) for key, value in _percentiles(timings).items()}
+    result.update({
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'requests': run.requests,
+        'errors': errors,
+        'queries': len(queries.captured_queries),
+        'peak_memory_kb': round(peak / 1024),
+    })
+    return result
+
+
+def run_benchmarks(sizes, admin, requests=50, scenarios=None, history=2, progress=None):
+    """
+    Scale Benchmark:
+    For each fleet size (ascending), tops the BENCH-* fleet up to that many
+    assets with seed_fleet() and runs every scenario against it.
+    Returns a JSON-ready report: environment + {size: {seed, scenarios}}.
+    """
+    progress = progress or (lambda message: None)
+    scenarios = scenarios or list(SCENARIOS)
+    if 'api_return' in scenarios and 'api_checkout' not in scenarios[:scenarios.index('api_return')]:
+        raise ValueError("api_return returns the assets api_checkout checked out: run api_checkout first.")
+    report = {
+        'generated_at': timezone.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'audit_log_mode': settings.AUDIT_LOG['MODE'],
+            'requests_per_scenario': requests,
+        },
+        'sizes': {},
+    }
+
+    for size in sorted(sizes):
+        existing = Asset.objects.filter(serial_number__startswith=f'{FLEET_PREFIX}-').count()
+        progress(f"Seeding {max(0, size - existing)} assets (fleet size {size})...")
+        seeded = seed_fleet(max(0, size - existing), prefix=FLEET_PREFIX, history=history)
+
+        run = BenchmarkRun(admin, requests)
+        results = {}
+        for name in scenarios:
+            progress(f"  {name}")
+            results[name] = measure(SCENARIOS[name], run)
+        report['sizes'][str(size)] = {'seed': seeded.as_dict(), 'scenarios': results}
+    return report
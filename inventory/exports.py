@@ -0,0 +1,27 @@
+from .models import Asset
+
+# (column header, values_list lookup)
+ASSET_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('name', 'name'),
+    ('serial_number', 'serial_number'),
+    ('category', 'category__name'),
+    ('status', 'status'),
+    ('assigned_to', 'assigned_to__email'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+]
+
+
+def asset_export_queryset(queryset=None, status=None, category=None):
+    """
+    Optional filters: status (e.g. ASSIGNED) and category name.
+    Oldest first on (created_at, id), which asset_created_id_idx serves directly.
+    """
+    if queryset is None:
+        queryset = Asset.objects.all()
+    if status:
+        queryset = queryset.filter(status=status.upper())
+    if category:
+        queryset = queryset.filter(category__name=category)
+    return queryset.order_by('created_at', 'id')
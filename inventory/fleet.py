@@ -0,0 +1,124 @@
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from audit.models import AuditLog
+from common.cache import response_cache
+from .models import Asset, Category
+from .summary import apply_deltas
+
+User = get_user_model()
+
+FLEET_PASSWORD = 'fleet-password'  # Every seeded user can log in with it
+CATEGORY_NAMES = ['Laptops', 'Monitors', 'Phones', 'Tablets', 'Docks', 'Headsets', 'Keyboards', 'Licenses']
+MODELS = ['Pro 14', 'Air 13', 'UltraSharp 27', 'Pixel 8', 'ThinkPad X1', 'Surface 9', 'Galaxy Tab', 'Dock G4']
+# Status mix of a real fleet (weights); ASSIGNED assets get a holder
+STATUS_WEIGHTS = {
+    Asset.Status.ASSIGNED: 55,
+    Asset.Status.AVAILABLE: 30,
+    Asset.Status.UNDER_REPAIR: 5,
+    Asset.Status.BROKEN: 5,
+    Asset.Status.ARCHIVED: 5,
+}
+
+
+@dataclass
+class FleetResult:
+    users: int = 0
+    categories: int = 0
+    assets: int = 0
+    audit_logs: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+def seed_fleet(assets, users=None, categories=8, history=2, prefix='FLEET', batch_size=5000, seed=0):
+    """
+    Synthetic Fleet:
+    Adds `assets` assets (plus `users` employees, default one per 10 assets,
+    and up to `categories` categories) with bulk_create() in batches of
+    `batch_size`, so 1M assets take minutes instead of hours.
+    Each asset gets `history` audit entries (CREATED, then ASSIGNED/RETURNED).
+    Serial numbers and emails start with `prefix` and continue after the
+    rows of earlier runs, so the command can grow an existing fleet.
+    Same `seed` -> same names, statuses and holders. No signals are sent;
+    InventorySummary is updated directly.
+    """
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    result = FleetResult()
+    users = max(1, assets // 10) if users is None else users
+
+    with transaction.atomic():
+        category_ids = _seed_categories(categories, result)
+        user_ids = _seed_users(users, prefix, batch_size, result)
+        _seed_assets(assets, prefix, category_ids, user_ids, history, batch_size, rng, result)
+
+    response_cache.invalidate('assets')
+    response_cache.invalidate('categories')
+    result.seconds = round(time.perf_counter() - started, 2)
+    return result
+
+
+def _seed_categories(count, result):
+    names = CATEGORY_NAMES[:count] + [f'Category {number}' for number in range(len(CATEGORY_NAMES), count)]
+    existing = set(Category.objects.filter(name__in=names).values_list('name', flat=True))
+    missing = [Category(name=name) for name in names if name not in existing]
+    Category.objects.bulk_create(missing)
+    result.categories = len(missing)
+    return list(Category.objects.filter(name__in=names).values_list('id', flat=True))
+
+
+def _seed_users(count, prefix, batch_size, result):
+    start = User.objects.filter(email__startswith=f'{prefix.lower()}-').count()
+    password = make_password(FLEET_PASSWORD)  # Hashed once, not once per user
+    users = [
+        User(
+            email=f'{prefix.lower()}-{number}@fleet.techvault.test', password=password,
+            first_name='Fleet', last_name=f'User {number}',
+        )
+        for number in range(start, start + count)
+    ]
+    User.objects.bulk_create(users, batch_size=batch_size)
+    result.users = len(users)
+    return list(User.objects.filter(email__startswith=f'{prefix.lower()}-').values_list('id', flat=True))
+
+
+def _seed_assets(count, prefix, category_ids, user_ids, history, batch_size, rng, result):
+    start = Asset.objects.filter(serial_number__startswith=f'{prefix}-').count()
+    content_type = ContentType.objects.get_for_model(Asset)
+    statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+
+    for batch_start in range(start, start + count, batch_size):
+        batch_end = min(batch_start + batch_size, start + count)
+        assets = []
+        for number in range(batch_start, batch_end):
+            status = rng.choices(statuses, weights)[0]
+            if status == Asset.Status.ASSIGNED and not user_ids:
+                status = Asset.Status.AVAILABLE
+            assets.append(Asset(
+                name=f'{rng.choice(MODELS)} #{number}',
+                serial_number=f'{prefix}-{number:09d}',
+                category_id=rng.choice(category_ids),
+                status=status,
+                assigned_to_id=rng.choice(user_ids) if status == Asset.Status.ASSIGNED else None,
+            ))
+        Asset.objects.bulk_create(assets)
+        apply_deltas(Counter((asset.category_id, asset.status) for asset in assets))
+        result.assets += len(assets)
+
+        logs = []
+        for asset in assets:
+            actions = ['CREATED'] + ['ASSIGNED', 'RETURNED'] * history
+            logs += [
+                AuditLog(content_type=content_type, object_id=str(asset.id), action=action, changes={'status': asset.status})
+                for action in actions[:history]
+            ]
+        AuditLog.objects.bulk_create(logs, batch_size=batch_size)
+        result.audit_logs += len(logs)
@@ -0,0 +1,119 @@
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+from common.cache import response_cache
+from .models import Asset
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_DIR = 'assets/derivatives'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _config(key):
+    return settings.IMAGE_DERIVATIVES[key]
+
+
+def render_derivatives(source):
+    """
+    Returns {label: webp_bytes} for every size in IMAGE_DERIVATIVES['SIZES'].
+    - draft() lets the JPEG decoder scale down while decoding, so a 12 MP
+      phone photo is never fully decoded.
+    - EXIF orientation is applied, so portrait photos stay upright.
+    - Sizes are produced largest first, each one from the previous one.
+    """
+    sizes = sorted(_config('SIZES').items(), key=lambda item: item[1][0] * item[1][1], reverse=True)
+    largest = max(max(size) for _, size in sizes)
+
+    with Image.open(source) as original:
+        original.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    derivatives = {}
+    for label, size in sizes:
+        image.thumbnail(size, Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format='WEBP', quality=_config('QUALITY'), method=4)
+        derivatives[label] = buffer.getvalue()
+    return derivatives
+
+
+def build_derivatives(asset_id):
+    """
+    Builds the derivatives of the asset's current photo and records them in
+    Asset.image_derivatives. File names carry a fingerprint of their content
+    (thumb-<sha256>.webp), so they can be served with far-future cache headers:
+    a new photo always means a new URL.
+    Returns the new image_derivatives, or None if there was nothing to do.
+    """
+    row = Asset.objects.filter(pk=asset_id).values_list('photo', 'image_derivatives').first()
+    if not row or not row[0]:
+        return None
+    source, current = row
+    if current.get('source') == source:
+        return None  # Already built for this photo
+
+    derivatives = {'source': source}
+    try:
+        with default_storage.open(source) as handle:
+            rendered = render_derivatives(handle)
+    except (OSError, Image.DecompressionBombError) as exc:
+        # Remember the failure so the same file is not retried on every save
+        logger.warning("Cannot build derivatives of %s for asset %s: %s", source, asset_id, exc)
+        rendered = {}
+
+    for label, data in rendered.items():
+        name = f"{DERIVATIVE_DIR}/{label}-{hashlib.sha256(data).hexdigest()[:20]}.webp"
+        if not default_storage.exists(name):
+            name = default_storage.save(name, ContentFile(data))
+        derivatives[label] = name
+
+    # Only if nobody uploaded another photo in the meantime
+    updated = Asset.objects.filter(pk=asset_id, photo=source).update_without_invalidation(
+        image_derivatives=derivatives, updated_at=timezone.now(),
+    )
+    if updated:
+        response_cache.invalidate('assets', [asset_id])
+    return derivatives
+
+
+def _build_in_background(asset_id):
+    try:
+        build_derivatives(asset_id)
+    except Exception:
+        logger.exception("Building image derivatives for asset %s failed.", asset_id)
+    finally:
+        connections.close_all()  # This thread's own connections
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_config('WORKERS'), thread_name_prefix='image-derivatives',
+            )
+        return _executor
+
+
+def schedule_derivatives(asset_id):
+    """
+    Queues build_derivatives() for after COMMIT, on a small thread pool, so
+    the upload request returns as soon as the original is stored.
+    IMAGE_DERIVATIVES['MODE'] = 'sync' builds them right away instead (tests, scripts).
+    """
+    if _config('MODE') == 'sync':
+        build_derivatives(asset_id)
+        return
+    transaction.on_commit(lambda: _get_executor().submit(_build_in_background, asset_id))
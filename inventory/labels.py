@@ -0,0 +1,224 @@
+import hashlib
+import io
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageDraw, ImageFont
+from common.cache import response_cache
+from .models import Asset
+from .qr import render_many, render_qr_png
+
+QR_DIR = Asset._meta.get_field('image').upload_to.rstrip('/')
+RENDER_VERSION = 1  # Bump when render_qr_png() output changes, so every code is redrawn
+JOBS_PER_TASK = 64  # QR codes per process pool task
+# Files written by this pipeline: <QR_DIR>/<2 hex>/<sha256>.png
+GENERATED_NAME = re.compile(rf'^{re.escape(QR_DIR)}/[0-9a-f]{{2}}/[0-9a-f]{{64}}\.png$')
+
+
+def _config(key):
+    return settings.QR_LABELS[key]
+
+
+def _render_options():
+    return {
+        'box_size': _config('BOX_SIZE'),
+        'border': _config('BORDER'),
+        'error_correction': _config('ERROR_CORRECTION'),
+    }
+
+
+def qr_payload(asset_id, serial_number):
+    return _config('PAYLOAD').format(id=asset_id, serial_number=serial_number)
+
+
+def qr_storage_name(payload, options):
+    """
+    Content address: the same payload and render options always map to the
+    same file, so an unchanged asset is never rendered twice.
+    """
+    digest = hashlib.sha256(json.dumps([RENDER_VERSION, payload, options], sort_keys=True).encode()).hexdigest()
+    return f"{QR_DIR}/{digest[:2]}/{digest}.png"
+
+
+@dataclass
+class QRResult:
+    rendered: int = 0   # New PNGs drawn
+    reused: int = 0     # PNG already in storage (e.g. another run drew it)
+    unchanged: int = 0  # Asset already points at its current code
+    skipped: int = 0    # Asset has an image that this pipeline did not create
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+def _render(jobs, executor):
+    """
+    [(name, payload, options)] -> {name: png_bytes}, on the pool when there is one.
+    """
+    if executor is None:
+        return dict(render_many(jobs))
+    tasks = [jobs[start:start + JOBS_PER_TASK] for start in range(0, len(jobs), JOBS_PER_TASK)]
+    return {name: png for results in executor.map(render_many, tasks) for name, png in results}
+
+
+def generate_qr_codes(queryset=None, workers=None, batch_size=500, force=False):
+    """
+    QR Pipeline:
+    1. Walk the assets in batches of `batch_size` (values only, no model instances).
+    2. Work out each asset's content-addressed file name. Assets already
+       pointing at it are done; files another asset or run already drew are reused.
+    3. Render the rest in parallel on a process pool (`workers`, default
+       QR_LABELS['WORKERS'] or the CPU count; 1 renders in-process).
+    4. Point Asset.image at the files with one bulk_update per batch.
+    Images that were not produced by this pipeline are left alone unless `force`.
+    """
+    if queryset is None:
+        queryset = Asset.objects.all()
+    workers = workers or _config('WORKERS') or os.cpu_count() or 1
+    options = _render_options()
+    result = QRResult()
+
+    rows = queryset.order_by().values_list('id', 'serial_number', 'image').iterator(chunk_size=batch_size)
+    executor = None
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                executor = _process_batch(batch, options, workers, executor, force, result)
+                batch = []
+        if batch:
+            executor = _process_batch(batch, options, workers, executor, force, result)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return result
+
+
+def _process_batch(batch, options, workers, executor, force, result):
+    targets = {}
+    for asset_id, serial_number, image in batch:
+        payload = qr_payload(asset_id, serial_number)
+        name = qr_storage_name(payload, options)
+        if image == name:
+            result.unchanged += 1
+        elif image and not force and not GENERATED_NAME.match(image):
+            result.skipped += 1
+        else:
+            targets[asset_id] = (name, payload)
+
+    missing = {}
+    for name, payload in targets.values():
+        if name not in missing and not default_storage.exists(name):
+            missing[name] = payload
+    result.reused += sum(1 for name, _ in targets.values() if name not in missing)
+
+    if missing:
+        if executor is None and workers > 1 and len(missing) > JOBS_PER_TASK:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        jobs = [(name, payload, options) for name, payload in missing.items()]
+        for name, png in _render(jobs, executor).items():
+            default_storage.save(name, ContentFile(png))
+            result.rendered += 1
+
+    if targets:
+        now = timezone.now()
+        Asset.objects.bulk_update(
+            [Asset(id=asset_id, image=name, updated_at=now) for asset_id, (name, _) in targets.items()],
+            ['image', 'updated_at'],
+        )
+        response_cache.invalidate('assets', list(targets))  # image is part of the API payload
+    return executor
+
+
+# --- Label sheets ---
+
+def _font(size):
+    return ImageFont.load_default(size=size)
+
+
+def _draw_label(page, box, qr_image, name, serial_number):
+    left, top, width, height = box
+    padding = height // 10
+    # Whole pixels per QR module, or scanners trip over uneven modules
+    modules = qr_image.width // _config('BOX_SIZE')
+    qr_size = modules * max(1, (height - 2 * padding) // modules)
+    page.paste(qr_image.resize((qr_size, qr_size), Image.NEAREST), (left + padding, top + (height - qr_size) // 2))
+
+    draw = ImageDraw.Draw(page)
+    text_left = left + qr_size + 2 * padding
+    text_width = width - qr_size - 3 * padding
+    title_font, serial_font = _font(height // 7), _font(height // 9)
+    while name and draw.textlength(name, font=title_font) > text_width:
+        name = name[:-4] + '...' if len(name) > 3 else ''
+    draw.text((text_left, top + padding), name, font=title_font, fill=0)
+    draw.text((text_left, top + height // 2), serial_number, font=serial_font, fill=0)
+
+
+def _label_qr(payload, options):
+    """
+    The QR code of `payload`: the content-addressed PNG if the pipeline
+    already stored it, otherwise rendered in memory (e.g. for an asset whose
+    image was skipped as a custom picture).
+    """
+    name = qr_storage_name(payload, options)
+    if default_storage.exists(name):
+        with default_storage.open(name) as handle:
+            qr_image = Image.open(handle)
+            qr_image.load()
+        return qr_image
+    return Image.open(io.BytesIO(render_qr_png(payload, **options)))
+
+
+def compose_label_sheets(queryset, output_path, columns=None, rows=None):
+    """
+    Print-Ready Label Sheets:
+    Lays out QR code + name + serial number in a grid (QR_LABELS['COLUMNS'] x
+    ['ROWS'] per page) and writes a multi-page PDF at QR_LABELS['DPI'].
+    Pages are 1-bit and appended to the PDF one at a time, so memory stays
+    the same for 50 or 50,000 labels. Assets without a QR code get one first.
+    Each label's code is drawn from its payload (see _label_qr), never from
+    whatever file Asset.image points to.
+    Returns the number of pages.
+    """
+    generate_qr_codes(queryset)
+    options = _render_options()
+
+    columns = columns or _config('COLUMNS')
+    rows = rows or _config('ROWS')
+    dpi = _config('DPI')
+    page_width, page_height = (round(inches * dpi) for inches in _config('PAGE_INCHES'))
+    margin = round(_config('MARGIN_INCHES') * dpi)
+    cell_width = (page_width - 2 * margin) // columns
+    cell_height = (page_height - 2 * margin) // rows
+    per_page = columns * rows
+
+    pages = 0
+    page = None
+    assets = queryset.order_by('serial_number').values_list('id', 'name', 'serial_number')
+    for index, (asset_id, name, serial_number) in enumerate(assets.iterator()):
+        slot = index % per_page
+        if slot == 0:
+            if page is not None:
+                _write_page(page, output_path, dpi, append=pages > 0)
+                pages += 1
+            page = Image.new('1', (page_width, page_height), 1)
+
+        column, row = slot % columns, slot // columns
+        box = (margin + column * cell_width, margin + row * cell_height, cell_width, cell_height)
+        _draw_label(page, box, _label_qr(qr_payload(asset_id, serial_number), options), name, serial_number)
+
+    if page is not None:
+        _write_page(page, output_path, dpi, append=pages > 0)
+        pages += 1
+    return pages
+
+
+def _write_page(page, output_path, dpi, append):
+    page.save(output_path, 'PDF', resolution=dpi, append=append)
@@ -0,0 +1,46 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from inventory.models import Asset
+from inventory.serializers import AssetReadSerializer, AssetSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare AssetSerializer with the fast AssetReadSerializer path on real rows (same JSON, less CPU)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help="Assets per run.")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per serializer; the best one counts.")
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/api/assets/'))
+        context = {'request': request}
+        assets = Asset.objects.select_related('category', 'assigned_to').order_by('-created_at', '-id')
+        instances = list(assets[:options['limit']])
+        rows = list(assets.values(*AssetReadSerializer.values_for())[:options['limit']])
+        if not rows:
+            raise CommandError("No assets to serialize. Create some first (e.g. with import_assets).")
+
+        renderer = JSONRenderer()
+        timings = {}
+        output = {}
+        for label, serializer_class, data in (
+            ('AssetSerializer', AssetSerializer, instances),
+            ('AssetReadSerializer', AssetReadSerializer, rows),
+        ):
+            best = None
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                output[label] = renderer.render(serializer_class(data, many=True, context=context).data)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = best
+            self.stdout.write(f"{label:<20} {best * 1000:8.1f} ms for {len(rows)} assets")
+
+        if output['AssetSerializer'] != output['AssetReadSerializer']:
+            raise CommandError("Outputs differ: AssetReadSerializer is out of sync with AssetSerializer.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Identical output, {timings['AssetSerializer'] / timings['AssetReadSerializer']:.1f}x faster."
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from inventory.images import build_derivatives
+from inventory.models import Asset
+
+
+class Command(BaseCommand):
+    help = "Build the thumbnail/WebP derivatives of asset photos that do not have them yet."
+
+    def handle(self, *args, **options):
+        built = 0
+        assets = Asset.objects.exclude(photo='').exclude(photo__isnull=True).values_list('pk', flat=True)
+        for asset_id in assets.iterator():
+            if build_derivatives(asset_id) is not None:
+                built += 1
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {built} assets."))
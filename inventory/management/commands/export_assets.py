@@ -0,0 +1,33 @@
+import sys
+from django.core.management.base import BaseCommand
+from common.exporters import EXPORT_FORMATS, iter_export
+from inventory.exports import ASSET_EXPORT_COLUMNS, asset_export_queryset
+
+
+class Command(BaseCommand):
+    help = "Stream all assets to a CSV or JSONL file (memory use does not grow with the row count)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Output file, or '-' for stdout.")
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true', help="Compress the output (implied by a .gz path).")
+        parser.add_argument('--status', help="Only assets in this status, e.g. ASSIGNED.")
+        parser.add_argument('--category', help="Only assets of this category (by name).")
+        parser.add_argument('--chunk-size', type=int, help="Rows per cursor fetch (default: EXPORT_CHUNK_SIZE).")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        queryset = asset_export_queryset(status=options['status'], category=options['category'])
+        chunks = iter_export(
+            queryset, ASSET_EXPORT_COLUMNS, options['format'],
+            compress=options['gzip'] or path.endswith('.gz'),
+            chunk_size=options['chunk_size'],
+        )
+        if path == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+        with open(path, 'wb') as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported assets to {path}."))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from inventory.labels import generate_qr_codes
+from inventory.models import Asset
+
+
+class Command(BaseCommand):
+    help = "Render QR codes for assets that have none (or an outdated one), in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help="Render processes (default: QR_LABELS['WORKERS'] or CPU count).")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--status', help="Only assets in this status.")
+        parser.add_argument('--category', help="Only assets of this category (by name).")
+        parser.add_argument('--force', action='store_true',
+                            help="Also replace images that were not generated by this command.")
+
+    def handle(self, *args, **options):
+        assets = Asset.objects.all()
+        if options['status']:
+            assets = assets.filter(status=options['status'].upper())
+        if options['category']:
+            assets = assets.filter(category__name=options['category'])
+
+        result = generate_qr_codes(
+            assets, workers=options['workers'], batch_size=options['batch_size'], force=options['force'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {result.rendered}, reused {result.reused}, unchanged {result.unchanged}, "
+            f"skipped {result.skipped} (custom image)."
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from inventory.importers import AssetImporter, DEFAULT_CHUNK_SIZE, IMPORT_FORMATS
+
+
+class Command(BaseCommand):
+    help = "Bulk-import assets from a CSV or JSONL file (columns: name, serial_number, category, status)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import.")
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--create-categories', action='store_true',
+                            help="Create categories that do not exist yet instead of rejecting the row.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError(f"Cannot guess the format of '{path}'. Pass --format.")
+
+        importer = AssetImporter(
+            chunk_size=options['chunk_size'],
+            create_categories=options['create_categories'],
+        )
+        try:
+            with open(path, 'rb') as handle:
+                result = importer.run(handle, file_format)
+        except (OSError, ValueError) as exc:
+            raise CommandError(exc)
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']} ({error['serial_number']}): {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} assets, {len(result.errors)} rows failed."
+        ))
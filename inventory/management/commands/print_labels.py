@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from inventory.labels import compose_label_sheets
+from inventory.models import Asset
+
+
+class Command(BaseCommand):
+    help = "Write a print-ready PDF of QR labels (QR code, name, serial number) for the selected assets."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Output PDF.")
+        parser.add_argument('--status', help="Only assets in this status.")
+        parser.add_argument('--category', help="Only assets of this category (by name).")
+        parser.add_argument('--columns', type=int, help="Labels per row (default: QR_LABELS['COLUMNS']).")
+        parser.add_argument('--rows', type=int, help="Label rows per page (default: QR_LABELS['ROWS']).")
+
+    def handle(self, *args, **options):
+        assets = Asset.objects.all()
+        if options['status']:
+            assets = assets.filter(status=options['status'].upper())
+        if options['category']:
+            assets = assets.filter(category__name=options['category'])
+
+        pages = compose_label_sheets(assets, options['path'], columns=options['columns'], rows=options['rows'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {pages} page(s) to {options['path']}."))
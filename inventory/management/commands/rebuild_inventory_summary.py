@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from inventory.summary import rebuild_summary, verify_summary
+
+
+class Command(BaseCommand):
+    help = "Check the InventorySummary counts against the Asset table and rebuild them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify', action='store_true',
+            help="Only report rows that are off (exit code 1 if any), do not rebuild.",
+        )
+
+    def handle(self, *args, **options):
+        mismatches = verify_summary()
+        for category_id, status, summary_count, actual_count in mismatches:
+            self.stdout.write(f"category {category_id} / {status}: summary {summary_count}, actual {actual_count}")
+
+        if options['verify']:
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} summary rows are off. Run without --verify to rebuild.")
+            self.stdout.write(self.style.SUCCESS("InventorySummary matches the Asset table."))
+            return
+
+        rows = rebuild_summary()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt InventorySummary: {rows} rows, {len(mismatches)} were off."))
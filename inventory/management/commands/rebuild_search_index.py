@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from inventory.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the asset search index from the asset and user tables."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search index ({type(backend).__name__})."))
@@ -0,0 +1,71 @@
+import json
+import sys
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from inventory.benchmarks import SCENARIOS, run_benchmarks
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the dashboard and the main API endpoints in-process against growing synthetic fleets "
+        "and write p50/p95/p99 latency, SQL query counts and peak memory as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,100000,1000000', help="Comma-separated fleet sizes (assets).")
+        parser.add_argument('--requests', type=int, default=50, help="Timed requests per scenario and size.")
+        parser.add_argument('--scenarios', help=f"Comma-separated subset of: {', '.join(SCENARIOS)}.")
+        parser.add_argument('--output', default='-', help="Report file, or '-' for stdout.")
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help="Keep the benchmark database, so the next run does not seed the same fleet again.",
+        )
+        parser.add_argument(
+            '--use-current-database', action='store_true',
+            help="Seed and measure the configured database instead of a throwaway test database.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers, e.g. 1000,100000.")
+        scenarios = options['scenarios'].split(',') if options['scenarios'] else None
+        unknown = set(scenarios or ()) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}.")
+        if options['requests'] < 2:
+            raise CommandError("--requests must be at least 2 to compute percentiles.")
+
+        # Same database handling as `manage.py test`: never touch the real data by accident
+        old_name = None
+        if not options['use_current_database']:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        setup_test_environment()  # 'testserver' host, locmem email
+        try:
+            admin, _ = User.objects.get_or_create(
+                email='benchmark-admin@fleet.techvault.test',
+                defaults={'role': User.Role.ADMIN, 'is_staff': True, 'first_name': 'Benchmark'},
+            )
+            report = run_benchmarks(
+                sizes, admin, requests=options['requests'], scenarios=scenarios,
+                progress=lambda message: self.stderr.write(message),
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        finally:
+            teardown_test_environment()
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        output = json.dumps(report, indent=2, sort_keys=True) + '\n'
+        if options['output'] == '-':
+            sys.stdout.write(output)
+            return
+        with open(options['output'], 'w') as handle:
+            handle.write(output)
+        self.stderr.write(self.style.SUCCESS(f"Wrote the benchmark report to {options['output']}."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from inventory.fleet import FLEET_PASSWORD, seed_fleet
+
+
+class Command(BaseCommand):
+    help = "Add a synthetic fleet (users, categories, assets, audit history) with bulk inserts, for load tests."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assets', type=int, default=1000, help="Assets to add.")
+        parser.add_argument('--users', type=int, help="Employees to add (default: one per 10 assets).")
+        parser.add_argument('--categories', type=int, default=8, help="Categories to spread the assets over.")
+        parser.add_argument('--history', type=int, default=2, help="Audit entries per asset.")
+        parser.add_argument('--prefix', default='FLEET', help="Prefix of the serial numbers and emails.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed (same seed, same fleet).")
+
+    def handle(self, *args, **options):
+        if options['assets'] < 0 or options['categories'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--assets must be >= 0, --categories and --batch-size >= 1.")
+        result = seed_fleet(
+            options['assets'], users=options['users'], categories=options['categories'],
+            history=options['history'], prefix=options['prefix'],
+            batch_size=options['batch_size'], seed=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {result.assets} assets, {result.users} users, {result.categories} categories and "
+            f"{result.audit_logs} audit entries in {result.seconds}s. "
+            f"Seeded users log in with the password '{FLEET_PASSWORD}'."
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_alter_asset_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['created_at', 'id'], name='asset_created_id_idx'),
+        ),
+    ]
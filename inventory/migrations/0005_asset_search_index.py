@@ -0,0 +1,87 @@
+from django.db import migrations
+
+# See inventory/search.py for how each backend uses these structures.
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS asset_name_trgm ON inventory_asset USING gin (UPPER(name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS asset_serial_trgm ON inventory_asset USING gin (UPPER(serial_number) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS user_email_trgm ON users_user USING gin (UPPER(email) gin_trgm_ops)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS asset_name_trgm",
+    "DROP INDEX IF EXISTS asset_serial_trgm",
+    "DROP INDEX IF EXISTS user_email_trgm",
+]
+
+SQLITE_FTS_TABLE = (
+    "CREATE VIRTUAL TABLE inventory_asset_fts USING fts5("
+    "name, serial_number, holder_email, tokenize = '{tokenizer}')"
+)
+SQLITE_FORWARD = [
+    # rowid of the FTS row == rowid of the asset row
+    "INSERT INTO inventory_asset_fts(rowid, name, serial_number, holder_email) "
+    "SELECT a.rowid, a.name, a.serial_number, u.email "
+    "FROM inventory_asset a LEFT JOIN users_user u ON u.id = a.assigned_to_id",
+
+    "CREATE TRIGGER inventory_asset_fts_insert AFTER INSERT ON inventory_asset BEGIN "
+    "INSERT INTO inventory_asset_fts(rowid, name, serial_number, holder_email) "
+    "VALUES (new.rowid, new.name, new.serial_number, "
+    "(SELECT email FROM users_user WHERE id = new.assigned_to_id)); END",
+
+    "CREATE TRIGGER inventory_asset_fts_update AFTER UPDATE OF name, serial_number, assigned_to_id "
+    "ON inventory_asset BEGIN "
+    "UPDATE inventory_asset_fts SET name = new.name, serial_number = new.serial_number, "
+    "holder_email = (SELECT email FROM users_user WHERE id = new.assigned_to_id) "
+    "WHERE rowid = new.rowid; END",
+
+    "CREATE TRIGGER inventory_asset_fts_delete AFTER DELETE ON inventory_asset BEGIN "
+    "DELETE FROM inventory_asset_fts WHERE rowid = old.rowid; END",
+
+    "CREATE TRIGGER users_user_fts_email AFTER UPDATE OF email ON users_user BEGIN "
+    "UPDATE inventory_asset_fts SET holder_email = new.email "
+    "WHERE rowid IN (SELECT rowid FROM inventory_asset WHERE assigned_to_id = new.id); END",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS inventory_asset_fts_insert",
+    "DROP TRIGGER IF EXISTS inventory_asset_fts_update",
+    "DROP TRIGGER IF EXISTS inventory_asset_fts_delete",
+    "DROP TRIGGER IF EXISTS users_user_fts_email",
+    "DROP TABLE IF EXISTS inventory_asset_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_FORWARD
+    elif vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_version()")
+            version = tuple(int(part) for part in cursor.fetchone()[0].split('.'))
+        # The trigram tokenizer (substring matching) needs SQLite 3.34+
+        tokenizer = 'trigram' if version >= (3, 34) else 'unicode61'
+        statements = [SQLITE_FTS_TABLE.format(tokenizer=tokenizer)] + SQLITE_FORWARD
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_asset_created_id_idx'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:02
+
+from django.db import migrations, models
+from inventory.migrations._sqlite_search import RESTORE_SEARCH_TRIGGERS, SUSPEND_SEARCH_TRIGGERS
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_asset_search_index'),
+    ]
+
+    operations = [
+        SUSPEND_SEARCH_TRIGGERS,  # SQLite rebuilds inventory_asset for the new column
+        migrations.AddField(
+            model_name='asset',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        RESTORE_SEARCH_TRIGGERS,
+    ]
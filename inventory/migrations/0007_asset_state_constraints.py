@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:10
+
+from django.conf import settings
+from django.db import migrations, models
+from inventory.migrations._sqlite_search import RESTORE_SEARCH_TRIGGERS, SUSPEND_SEARCH_TRIGGERS
+
+STATUSES = ['AVAILABLE', 'ASSIGNED', 'BROKEN', 'UNDER_REPAIR', 'ARCHIVED']
+
+
+def fix_invalid_rows(apps, schema_editor):
+    """
+    Rows written before the constraints existed (e.g. by QuerySet.update()).
+    Same outcome Asset.clean() would have produced, one UPDATE per rule.
+    """
+    Asset = apps.get_model('inventory', 'Asset')
+    # Unknown status: ASSIGNED if someone holds the asset, otherwise AVAILABLE
+    invalid = Asset.objects.exclude(status__in=STATUSES)
+    invalid.filter(assigned_to__isnull=False).update(status='ASSIGNED')
+    invalid.filter(assigned_to__isnull=True).update(status='AVAILABLE')
+    # Held but AVAILABLE: clean() auto-corrects this to ASSIGNED
+    Asset.objects.filter(assigned_to__isnull=False, status='AVAILABLE').update(status='ASSIGNED')
+    # Held while BROKEN / UNDER_REPAIR / ARCHIVED: the asset is not with the holder
+    Asset.objects.filter(assigned_to__isnull=False).exclude(status='ASSIGNED').update(assigned_to=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_asset_image_derivatives'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_invalid_rows, migrations.RunPython.noop),
+        SUSPEND_SEARCH_TRIGGERS,  # SQLite rebuilds inventory_asset to add the constraints
+        migrations.AddConstraint(
+            model_name='asset',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', STATUSES)), name='asset_status_valid'),
+        ),
+        migrations.AddConstraint(
+            model_name='asset',
+            constraint=models.CheckConstraint(condition=models.Q(('assigned_to__isnull', True), ('status', 'ASSIGNED'), _connector='OR'), name='asset_holder_requires_assigned', violation_error_message='Only an ASSIGNED asset can have a holder.'),
+        ),
+        RESTORE_SEARCH_TRIGGERS,
+    ]
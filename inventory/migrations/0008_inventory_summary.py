@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_summary(apps, schema_editor):
+    """
+    Initial counts; from here on they are maintained incrementally.
+    """
+    Asset = apps.get_model('inventory', 'Asset')
+    InventorySummary = apps.get_model('inventory', 'InventorySummary')
+    rows = Asset.objects.values('category_id', 'status').annotate(count=Count('id')).order_by()
+    InventorySummary.objects.bulk_create([
+        InventorySummary(category_id=row['category_id'], status=row['status'], count=row['count'])
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_asset_state_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('AVAILABLE', 'Available'), ('ASSIGNED', 'Assigned'), ('BROKEN', 'Broken'), ('UNDER_REPAIR', 'Under Repair'), ('ARCHIVED', 'Archived')], max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='summary_rows', to='inventory.category')),
+            ],
+            options={
+                'verbose_name_plural': 'Inventory summary',
+                'constraints': [models.UniqueConstraint(fields=('category', 'status'), name='inventory_summary_category_status')],
+            },
+        ),
+        migrations.RunPython(populate_summary, migrations.RunPython.noop),
+    ]
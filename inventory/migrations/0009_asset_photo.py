@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:42
+
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.fields.json import KT
+
+
+def move_photos(apps, schema_editor):
+    """
+    Photos uploaded before this migration were stored in `image`, replacing
+    the QR code. Those are the images the derivative pipeline ran on: move
+    them to `photo` and leave `image` empty for generate_qr_codes to refill.
+    """
+    Asset = apps.get_model('inventory', 'Asset')
+    photos = (
+        Asset.objects.exclude(image='').exclude(image__isnull=True)
+        .annotate(derivatives_source=KT('image_derivatives__source'))
+        .filter(derivatives_source=F('image'))
+    )
+    Asset.objects.filter(pk__in=photos.values('pk')).update(photo=F('image'), image=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_inventory_summary'),
+    ]
+
+    operations = [
+        # Nullable column: a plain ALTER TABLE on SQLite, no rebuild, so the
+        # search triggers stay (no SUSPEND/RESTORE_SEARCH_TRIGGERS needed)
+        migrations.AddField(
+            model_name='asset',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, upload_to='assets/photos/'),
+        ),
+        migrations.RunPython(move_photos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+"""
+FTS5 search index plumbing for SQLite (see inventory/search.py).
+
+SQLite applies most schema changes (new NOT NULL columns, constraints) by
+copying the asset table into a new one. That drops the triggers on it, makes
+the users_user trigger point at a missing table, and renumbers rowids.
+Migrations that rebuild inventory_asset or users_user therefore wrap their
+operations:
+
+    operations = [SUSPEND_SEARCH_TRIGGERS, ..., RESTORE_SEARCH_TRIGGERS]
+
+Not a migration itself: the loader skips modules starting with '_'.
+"""
+from django.db import migrations
+
+FTS_TABLE = 'inventory_asset_fts'
+
+# rowid of the FTS row == rowid of the asset row
+POPULATE = (
+    "INSERT INTO inventory_asset_fts(rowid, name, serial_number, holder_email) "
+    "SELECT a.rowid, a.name, a.serial_number, u.email "
+    "FROM inventory_asset a LEFT JOIN users_user u ON u.id = a.assigned_to_id"
+)
+
+CREATE_TRIGGERS = [
+    "CREATE TRIGGER inventory_asset_fts_insert AFTER INSERT ON inventory_asset BEGIN "
+    "INSERT INTO inventory_asset_fts(rowid, name, serial_number, holder_email) "
+    "VALUES (new.rowid, new.name, new.serial_number, "
+    "(SELECT email FROM users_user WHERE id = new.assigned_to_id)); END",
+
+    "CREATE TRIGGER inventory_asset_fts_update AFTER UPDATE OF name, serial_number, assigned_to_id "
+    "ON inventory_asset BEGIN "
+    "UPDATE inventory_asset_fts SET name = new.name, serial_number = new.serial_number, "
+    "holder_email = (SELECT email FROM users_user WHERE id = new.assigned_to_id) "
+    "WHERE rowid = new.rowid; END",
+
+    "CREATE TRIGGER inventory_asset_fts_delete AFTER DELETE ON inventory_asset BEGIN "
+    "DELETE FROM inventory_asset_fts WHERE rowid = old.rowid; END",
+
+    "CREATE TRIGGER users_user_fts_email AFTER UPDATE OF email ON users_user BEGIN "
+    "UPDATE inventory_asset_fts SET holder_email = new.email "
+    "WHERE rowid IN (SELECT rowid FROM inventory_asset WHERE assigned_to_id = new.id); END",
+]
+
+DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS inventory_asset_fts_insert",
+    "DROP TRIGGER IF EXISTS inventory_asset_fts_update",
+    "DROP TRIGGER IF EXISTS inventory_asset_fts_delete",
+    "DROP TRIGGER IF EXISTS users_user_fts_email",
+]
+
+
+def _has_fts_table(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def suspend_search_triggers(apps, schema_editor):
+    if _has_fts_table(schema_editor):
+        for statement in DROP_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+def restore_search_triggers(apps, schema_editor):
+    """
+    Recreates the triggers and refills the index (rowids may have changed).
+    """
+    if _has_fts_table(schema_editor):
+        for statement in DROP_TRIGGERS + [f"DELETE FROM {FTS_TABLE}", POPULATE] + CREATE_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+SUSPEND_SEARCH_TRIGGERS = migrations.RunPython(suspend_search_triggers, restore_search_triggers)
+RESTORE_SEARCH_TRIGGERS = migrations.RunPython(restore_search_triggers, suspend_search_triggers)
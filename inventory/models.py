@@ -2,10 +2,19 @@
 
 # Create your models here.
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.conf import settings 
-from common.models import TimeStampedModel
+from common.cache import response_cache
+from common.models import DirtyFieldsMixin, TimeStampedModel
+
+def current_derivative(image_name, derivatives, label):
+    """
+    File name of a derivative, or None if it was built from an older image.
+    """
+    if image_name and derivatives and derivatives.get('source') == image_name:
+        return derivatives.get(label)
+    return None
 
 class Category(TimeStampedModel):
     name = models.CharField(max_length=100, unique=True)
@@ -16,7 +25,59 @@ class Category(TimeStampedModel):
     def __str__(self):
         return self.name
 
-class Asset(TimeStampedModel):
+class AssetQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Custom Logic:
+        1. A bare update() sends no signal, so the receivers that keep the
+           response cache fresh never hear about it. It does not know which
+           rows it touched either: drop every cached asset response.
+        2. An update() that writes category or status locks and reads the
+           rows first, and reads them again after, so InventorySummary gets
+           the (category, status) deltas (three queries instead of one).
+        Code that reports its own changes (services.py sends
+        assets_bulk_updated, images.py never touches status) uses
+        update_without_invalidation() instead.
+        """
+        if not SUMMARY_FIELDS & kwargs.keys():
+            rows = super().update(**kwargs)
+        else:
+            from .summary import apply_deltas, deltas_between
+
+            with transaction.atomic(using=self.db):
+                before = self._summary_state(self.select_for_update())
+                rows = self.filter(pk__in=before).update_without_invalidation(**kwargs)
+                apply_deltas(deltas_between(before, self._summary_state(self.model.objects.filter(pk__in=before))))
+        if rows:
+            response_cache.invalidate_all('assets')
+        return rows
+
+    def update_from(self, before, **kwargs):
+        """
+        Compare-and-set: UPDATE ... WHERE (category_id, status) = `before`.
+        The rows it matched held `before`, so InventorySummary moves without
+        the SELECTs update() needs. Returns the number of rows updated.
+        """
+        from .summary import apply_deltas
+
+        category_id, status = before
+        rows = self.filter(category_id=category_id, status=status).update_without_invalidation(**kwargs)
+        after = (kwargs.get('category_id', category_id), kwargs.get('status', status))
+        if rows and after != before:
+            apply_deltas({before: -rows, after: rows})
+        return rows
+
+    def update_without_invalidation(self, **kwargs):
+        return super().update(**kwargs)
+
+    @staticmethod
+    def _summary_state(queryset):
+        return {pk: (category_id, status) for pk, category_id, status in queryset.values_list('pk', 'category_id', 'status')}
+
+# Asset fields InventorySummary counts by
+SUMMARY_FIELDS = {'category', 'category_id', 'status'}
+
+class Asset(DirtyFieldsMixin, TimeStampedModel):
     """
     Represents a physical item (Laptop, Phone, License).
     Includes the 'State Machine' logic via Status choices.
@@ -30,6 +91,8 @@ class Asset(TimeStampedModel):
         UNDER_REPAIR = "UNDER_REPAIR", "Under Repair"
         ARCHIVED = "ARCHIVED", "Archived"
 
+    objects = AssetQuerySet.as_manager()
+
     # Identification
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=200) # e.g. "MacBook Pro M1"
@@ -38,6 +101,11 @@ class Asset(TimeStampedModel):
     
     # The "File Handling" Requirement (QR Code storage)
     image = models.ImageField(upload_to='assets/qr_codes/', blank=True, null=True)
+    # Uploaded picture of the asset, kept apart from the QR code in `image`
+    photo = models.ImageField(upload_to='assets/photos/', blank=True, null=True)
+    # Resized WebP copies of `photo`, built off the request path (see inventory/images.py)
+    # {"source": <photo name they were built from>, "thumb": <file name>, "medium": <file name>}
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
 
     # Assignment Logic
     assigned_to = models.ForeignKey(
@@ -54,23 +122,138 @@ class Asset(TimeStampedModel):
         default=Status.AVAILABLE
     )
 
+    # Allowed status changes: current status -> statuses it may move to
+    TRANSITIONS = {
+        Status.AVAILABLE: {Status.ASSIGNED, Status.BROKEN, Status.UNDER_REPAIR, Status.ARCHIVED},
+        Status.ASSIGNED: {Status.AVAILABLE, Status.BROKEN, Status.UNDER_REPAIR},
+        Status.BROKEN: {Status.AVAILABLE, Status.UNDER_REPAIR, Status.ARCHIVED},
+        Status.UNDER_REPAIR: {Status.AVAILABLE, Status.BROKEN, Status.ARCHIVED},
+        Status.ARCHIVED: {Status.AVAILABLE},
+    }
+
+    class Meta:
+        indexes = [
+            # Backs keyset paging on (created_at, id) for the dashboard table
+            models.Index(fields=['created_at', 'id'], name='asset_created_id_idx'),
+        ]
+        # The state machine rules from clean(), enforced by the database too,
+        # so set-based QuerySet.update()/bulk_update() writes cannot break them
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(status__in=['AVAILABLE', 'ASSIGNED', 'BROKEN', 'UNDER_REPAIR', 'ARCHIVED']),
+                name='asset_status_valid',
+            ),
+            models.CheckConstraint(
+                condition=models.Q(assigned_to__isnull=True) | models.Q(status='ASSIGNED'),
+                name='asset_holder_requires_assigned',
+                violation_error_message="Only an ASSIGNED asset can have a holder.",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.serial_number})"
 
+    @property
+    def thumbnail_url(self):
+        name = current_derivative(self.photo.name if self.photo else None, self.image_derivatives, 'thumb')
+        return self.photo.storage.url(name) if name else None
+
     # The "Validation" Requirement
     def clean(self):
         """
         Custom Logic:
         1. An asset cannot be assigned if it is BROKEN or UNDER_REPAIR.
         2. If assigned_to is set, status must be ASSIGNED.
+        3. Status changes must follow Asset.TRANSITIONS.
+        Rules 1 and 2 are also CheckConstraints (see Meta.constraints).
         """
-        if self.assigned_to and self.status in [self.Status.BROKEN, self.Status.UNDER_REPAIR]:
+        # assigned_to_id, not assigned_to: no query to load the user
+        if self.assigned_to_id and self.status in [self.Status.BROKEN, self.Status.UNDER_REPAIR]:
             raise ValidationError("Cannot assign a broken or under-repair asset.")
         
         # Auto-correct status if assigned (optional helper)
-        if self.assigned_to and self.status == self.Status.AVAILABLE:
+        if self.assigned_to_id and self.status == self.Status.AVAILABLE:
             self.status = self.Status.ASSIGNED
 
+        if self.assigned_to_id and self.status != self.Status.ASSIGNED:
+            raise ValidationError("Only an ASSIGNED asset can have a holder.")
+
+        old_status = None if self._state.adding else getattr(self, '_loaded_values', {}).get('status')
+        if old_status and self.status != old_status and self.status not in self.TRANSITIONS.get(old_status, ()):
+            raise ValidationError({'status': f"Cannot change status from {old_status} to {self.status}."})
+
     def save(self, *args, **kwargs):
-        self.full_clean() # Force validation on every save
-        super().save(*args, **kwargs)
\ No newline at end of file
+        """
+        Custom Logic:
+        New assets get the full validation. For existing ones only the fields
+        that changed since loading (and are in update_fields, if given) are
+        validated, so flipping `status` does not re-check the category FK or
+        run the serial_number uniqueness SELECT. clean() always runs.
+        """
+        update_fields = kwargs.get('update_fields')
+        # validate_constraints=False: clean() already checks the same rules in
+        # Python, and the database enforces them on write (Q.check() costs a SELECT)
+        if self._state.adding:
+            self.full_clean(validate_constraints=False)
+        else:
+            changed = self.get_dirty_fields()
+            if update_fields is not None:
+                changed &= {self._meta.get_field(name).name for name in update_fields}
+            status = self.status
+            self.full_clean(
+                exclude=[field.name for field in self._meta.concrete_fields if field.name not in changed],
+                validate_constraints=False,
+            )
+            if update_fields is not None and self.status != status:
+                kwargs['update_fields'] = {*update_fields, 'status'}  # Set by clean()
+            if self._writes_summary_fields(kwargs.get('update_fields')):
+                with transaction.atomic():
+                    self._update_summary_fields(kwargs.get('update_fields'))
+                    super().save(*args, **kwargs)
+                return
+        super().save(*args, **kwargs)
+
+    def _writes_summary_fields(self, update_fields):
+        if update_fields is None:
+            return True
+        return bool({self._meta.get_field(name).name for name in update_fields} & SUMMARY_FIELDS)
+
+    def _update_summary_fields(self, update_fields):
+        """
+        Writes category and status (plus the holder, which the CheckConstraints
+        tie to status) through AssetQuerySet first, so InventorySummary follows
+        the row as it was at write time, not as this instance loaded it. The
+        save() that comes next writes the same values again.
+        """
+        names = {'category', 'status', 'assigned_to'}
+        if update_fields is not None:
+            names &= {self._meta.get_field(name).name for name in update_fields}
+        values = {field.attname: getattr(self, field.attname) for field in map(self._meta.get_field, names)}
+        row = Asset.objects.filter(pk=self.pk)
+        loaded = getattr(self, '_loaded_values', {})
+        if 'category_id' in loaded and 'status' in loaded:
+            if row.update_from((loaded['category_id'], loaded['status']), **values):
+                return
+        row.update(**values)  # Changed since loading (or never loaded): lock, read, count
+
+
+class InventorySummary(models.Model):
+    """
+    Materialized asset counts per (category, status), so the dashboard and
+    the stats API read a handful of rows instead of counting every asset.
+    Kept up to date incrementally by the code that changes assets (see
+    inventory/summary.py); `manage.py rebuild_inventory_summary` checks and
+    rebuilds it from the Asset table.
+    """
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='summary_rows')
+    status = models.CharField(max_length=50, choices=Asset.Status.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Inventory summary"
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'status'], name='inventory_summary_category_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.category_id} / {self.status}: {self.count}"
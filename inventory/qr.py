@@ -0,0 +1,37 @@
+import io
+import qrcode
+from qrcode.constants import ERROR_CORRECT_H, ERROR_CORRECT_L, ERROR_CORRECT_M, ERROR_CORRECT_Q
+
+# Deliberately free of Django imports: this module is what the label worker
+# processes import, so they start fast and never touch the database.
+
+ERROR_CORRECTION = {
+    'L': ERROR_CORRECT_L,
+    'M': ERROR_CORRECT_M,
+    'Q': ERROR_CORRECT_Q,
+    'H': ERROR_CORRECT_H,
+}
+
+
+def render_qr_png(payload, box_size=10, border=4, error_correction='M'):
+    """
+    Returns the QR code of `payload` as 1-bit PNG bytes.
+    """
+    code = qrcode.QRCode(
+        error_correction=ERROR_CORRECTION[error_correction],
+        box_size=box_size,
+        border=border,
+    )
+    code.add_data(payload)
+    code.make(fit=True)
+    image = code.make_image().get_image().convert('1')
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def render_many(jobs):
+    """
+    Worker entry point: [(key, payload, options), ...] -> [(key, png_bytes), ...]
+    """
+    return [(key, render_qr_png(payload, **options)) for key, payload, options in jobs]
@@ -0,0 +1,129 @@
+from collections import Counter
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from common.cache import response_cache
+from common.metrics import metrics
+from .images import schedule_derivatives
+from .models import Asset, Category
+from .signals import assets_bulk_created, assets_bulk_updated
+from .summary import apply_deltas, deltas_for_changes
+
+# Response cache invalidation (see common/cache.py). Each receiver only bumps
+# the generations of the rows a write actually touched.
+# Also starts the image derivative pipeline (see inventory/images.py) and
+# counts status transitions for /metrics (see common/metrics.py).
+# The InventorySummary receivers are at the bottom (see inventory/summary.py).
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=Asset)
+def invalidate_asset(sender, instance, **kwargs):
+    response_cache.invalidate('assets', [instance.pk])
+
+
+@receiver(post_save, sender=Asset)
+def build_image_derivatives(sender, instance, **kwargs):
+    """
+    New or replaced photo: make the thumbnails off the request path.
+    """
+    if instance.photo and instance.image_derivatives.get('source') != instance.photo.name:
+        schedule_derivatives(instance.pk)
+
+
+@receiver(assets_bulk_created, sender=Asset)
+def invalidate_bulk_created_assets(sender, assets, **kwargs):
+    # New rows only show up in lists; no detail entry can exist for them yet
+    response_cache.invalidate('assets')
+
+
+@receiver(assets_bulk_updated, sender=Asset)
+def invalidate_bulk_updated_assets(sender, changes, **kwargs):
+    response_cache.invalidate('assets', [change.asset_id for change in changes])
+
+
+@receiver(assets_bulk_updated, sender=Asset)
+def count_transitions(sender, action, changes, **kwargs):
+    transitions = Counter((change.old_status, change.new_status) for change in changes)
+
+    def count():  # Only transitions that were committed
+        for (old_status, new_status), amount in transitions.items():
+            metrics.inc(
+                'techvault_asset_transitions_total', amount,
+                action=action, from_status=old_status, to_status=new_status,
+            )
+
+    transaction.on_commit(count)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    response_cache.invalidate('categories', [instance.pk])
+
+
+@receiver(post_save, sender=User)
+def invalidate_holder(sender, instance, created, **kwargs):
+    """
+    Assets nest their holder (assigned_to_detail), so a user edit reaches them.
+    """
+    if created:
+        return
+    asset_ids = list(Asset.objects.filter(assigned_to=instance).values_list('pk', flat=True))
+    if asset_ids:
+        response_cache.invalidate('assets', asset_ids)
+
+
+@receiver(pre_delete, sender=User)
+def invalidate_deleted_holder(sender, instance, **kwargs):
+    # pre_delete: after the delete, SET_NULL has already cleared assigned_to
+    asset_ids = list(Asset.objects.filter(assigned_to=instance).values_list('pk', flat=True))
+    if asset_ids:
+        response_cache.invalidate('assets', asset_ids)
+
+
+# --- InventorySummary: the same writes, as (category, status) count deltas ---
+# The "before" state always comes from the row at write time, never from the
+# instance as it was loaded, so two racing writes cannot both apply a delta.
+# Saves of existing assets and QuerySet.update() count in AssetQuerySet.
+
+@receiver(post_save, sender=Asset)
+def update_summary_on_save(sender, instance, created, **kwargs):
+    if created:
+        apply_deltas({(instance.category_id, instance.status): 1})
+
+
+def _is_category_cascade(origin):
+    return getattr(origin, 'model', type(origin)) is Category
+
+
+@receiver(pre_delete, sender=Asset)
+def remember_deleted_summary_state(sender, instance, origin=None, **kwargs):
+    """
+    Runs inside the delete transaction: lock the row and read what it holds.
+    A delete that lost a race finds nothing and changes no count.
+    """
+    if _is_category_cascade(origin):
+        instance._summary_before = None  # The category's summary rows are deleted with it
+        return
+    instance._summary_before = (
+        Asset._base_manager.select_for_update().filter(pk=instance.pk).values_list('category_id', 'status').first()
+    )
+
+
+@receiver(post_delete, sender=Asset)
+def update_summary_on_delete(sender, instance, **kwargs):
+    before = instance.__dict__.pop('_summary_before', None)
+    if before is not None:
+        apply_deltas({before: -1})
+
+
+@receiver(assets_bulk_created, sender=Asset)
+def update_summary_on_bulk_create(sender, assets, **kwargs):
+    apply_deltas(Counter((asset.category_id, asset.status) for asset in assets))
+
+
+@receiver(assets_bulk_updated, sender=Asset)
+def update_summary_on_bulk_update(sender, changes, **kwargs):
+    apply_deltas(deltas_for_changes(changes))
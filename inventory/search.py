@@ -0,0 +1,197 @@
+from functools import lru_cache
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework import filters
+from .models import Asset
+
+FTS_TABLE = 'inventory_asset_fts'
+
+
+class BaseSearchBackend:
+    """
+    A search backend restricts an asset queryset to the matches of a
+    free-text query and annotates every row with `search_rank` (lower is a
+    better match). Matching covers the asset name, serial number and the
+    holder's email. Filtering and ranking stay in the SQL of the queryset,
+    so the database orders and pages over every match.
+    """
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def ranks(self, query):
+        """
+        False when every match of `query` gets the same `search_rank`; the
+        results are then paged newest first on the (created_at, id) keyset.
+        """
+        return True
+
+    def rebuild(self):
+        """
+        Re-derive any search structures from the source tables.
+        """
+
+
+def _matching_assets(queryset, query):
+    """
+    Every whitespace-separated term must match the name, serial or holder email.
+    """
+    for term in query.split():
+        queryset = queryset.filter(
+            Q(name__icontains=term) |
+            Q(serial_number__icontains=term) |
+            Q(assigned_to__email__icontains=term)
+        )
+    return queryset
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    Fallback for databases without a dedicated index: ILIKE '%term%' scans,
+    no ranking (newest first).
+    """
+    def search(self, queryset, query):
+        return _matching_assets(queryset, query).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def ranks(self, query):
+        return False
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Production backend. The ILIKE filters are the same as the fallback, but
+    migration 0005 adds pg_trgm GIN indexes on UPPER(name), UPPER(serial_number)
+    and UPPER(users_user.email), which is exactly what Django's icontains
+    compiles to, so they become index scans. Results are ranked by trigram
+    similarity. The indexes live on the base tables, so they are always in sync.
+    """
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import TrigramSimilarity
+        from django.db.models.functions import Greatest
+
+        similarity = Greatest(TrigramSimilarity('name', query), TrigramSimilarity('serial_number', query))
+        return _matching_assets(queryset, query).annotate(search_rank=-similarity)
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """
+    Local/test backend. Migration 0005 creates an FTS5 shadow table keyed by the
+    asset rowid and triggers on inventory_asset and users_user that keep it in
+    sync, including for bulk_create() and QuerySet.update().
+    With the trigram tokenizer (SQLite >= 3.34) MATCH finds substrings like the
+    old ILIKE did; older SQLite falls back to prefix matching.
+    The queryset is filtered with rowid IN (SELECT rowid FROM fts WHERE ...)
+    and ranked with bm25() of the same MATCH.
+    VACUUM may renumber rowids: run `manage.py rebuild_search_index` after it.
+    Migrations that make SQLite rebuild the asset table must wrap their
+    operations with the helpers in inventory/migrations/_sqlite_search.py.
+    """
+    def search(self, queryset, query):
+        terms = [term.replace('"', '""') for term in query.split()]
+        if not terms:
+            return queryset.none()
+        match, short_terms = self._match(terms)
+
+        where = []
+        params = []
+        if match:
+            where.append(f"{FTS_TABLE} MATCH %s")
+            params.append(match)
+        for term in short_terms:
+            where.append(
+                f"({FTS_TABLE}.name LIKE %s OR {FTS_TABLE}.serial_number LIKE %s "
+                f"OR {FTS_TABLE}.holder_email LIKE %s)"
+            )
+            params += [f"%{term}%"] * 3
+
+        asset_rowid = f'"{Asset._meta.db_table}".rowid'
+        matches = RawSQL(
+            f"{asset_rowid} IN (SELECT rowid FROM {FTS_TABLE} WHERE {' AND '.join(where)})",
+            params, output_field=BooleanField(),
+        )
+        if match:
+            rank = RawSQL(
+                f"(SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {asset_rowid})",
+                [match], output_field=FloatField(),
+            )
+        else:
+            rank = Value(0.0, output_field=FloatField())
+        return queryset.filter(matches).annotate(search_rank=rank)
+
+    def ranks(self, query):
+        return bool(self._match(query.split())[0])  # Only MATCH has a bm25() rank
+
+    def _match(self, terms):
+        """
+        (MATCH expression, terms left for LIKE). Trigram MATCH needs 3+
+        characters, so shorter terms are checked with LIKE.
+        """
+        if self._uses_trigrams():
+            match = ' '.join(f'"{term}"' for term in terms if len(term) >= 3)
+            return match, [term for term in terms if len(term) < 3]
+        return ' '.join(f'"{term}"*' for term in terms), []
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, name, serial_number, holder_email) "
+                "SELECT a.rowid, a.name, a.serial_number, u.email "
+                "FROM inventory_asset a LEFT JOIN users_user u ON u.id = a.assigned_to_id"
+            )
+
+    def _uses_trigrams(self):
+        if not hasattr(self, '_trigrams'):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT sql FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+                row = cursor.fetchone()
+            self._trigrams = bool(row) and 'trigram' in row[0]
+        return self._trigrams
+
+
+BACKENDS_BY_VENDOR = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteFTSSearchBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """
+    settings.ASSET_SEARCH_BACKEND (dotted path) wins; otherwise pick by database vendor.
+    """
+    path = settings.ASSET_SEARCH_BACKEND
+    backend_class = import_string(path) if path else BACKENDS_BY_VENDOR.get(connection.vendor, SimpleSearchBackend)
+    return backend_class()
+
+
+def search_assets(queryset, query):
+    """
+    Restricts `queryset` to the matches of `query` and annotates each row with
+    `search_rank` (lower = better match) so callers can order by relevance.
+    Every match is kept: ordering and paging happen in the database.
+    """
+    return get_search_backend().search(queryset, query)
+
+
+class AssetSearchFilter(filters.SearchFilter):
+    """
+    ?search= backed by the configured search backend instead of ILIKE scans.
+    Results come back in relevance order; cursor pagination pages over the rank.
+    Backends that cannot rank the query keep the newest-first keyset instead.
+    """
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_assets(queryset, query)
+
+    def get_ordering(self, request, queryset, view):
+        # Picked up by CursorPagination; None keeps the default (-created_at, -id)
+        query = request.query_params.get(self.search_param, '').strip()
+        if query and get_search_backend().ranks(query):
+            return ('search_rank', '-created_at', '-id')
+        return None
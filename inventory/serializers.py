@@ -1,5 +1,7 @@
+import copy
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import Category, Asset
+from .models import Category, Asset, current_derivative
 from users.serializers import UserSerializer
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -10,24 +12,127 @@ class CategorySerializer(serializers.ModelSerializer):
 class AssetSerializer(serializers.ModelSerializer):
     # Nested Serializer: Shows full user details instead of just ID when reading
     assigned_to_detail = UserSerializer(source='assigned_to', read_only=True)
+    # Small WebP derivative of `photo` (null until it has been built)
+    photo_thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = Asset
         fields = [
             'id', 'name', 'category', 'serial_number', 
-            'image', 'assigned_to', 'assigned_to_detail', 
+            'image', 'photo', 'photo_thumbnail', 'assigned_to', 'assigned_to_detail', 
             'status', 'created_at'
         ]
 
+    def get_photo_thumbnail(self, asset):
+        url = asset.thumbnail_url
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
     def validate(self, data):
         """
         Force Django Model Validation (clean method)
-        This ensures our 'State Machine' logic runs.
+        This ensures our 'State Machine' logic runs: the rules are checked on
+        the asset as it would be saved, so a violation is a 400 here instead
+        of an IntegrityError from the database constraints.
+        """
+        instance = copy.copy(self.instance) if self.instance is not None else Asset()
+        for field in ('status', 'assigned_to'):
+            if field in data:
+                setattr(instance, field, data[field])
+        try:
+            instance.clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict if hasattr(exc, 'error_dict') else exc.messages)
+        if instance.status != (self.instance.status if self.instance is not None else data.get('status')):
+            data['status'] = instance.status  # Auto-corrected by clean()
+        return data
+
+class AssetReadSerializer(serializers.BaseSerializer):
+    """
+    Fast read path for list/retrieve.
+    Works on plain dict rows from Asset.objects.values(*AssetReadSerializer.values_for(fields))
+    instead of model instances, and skips DRF's per-field machinery: every
+    field is converted by a getter prepared once. The JSON it produces is
+    byte-for-byte the same as AssetSerializer's
+    (see `manage.py benchmark_serializers` and the identity test).
+    Pass context['fields'] to output only some fields (sparse fieldsets).
+    """
+    FIELDS = AssetSerializer.Meta.fields
+    USER_FIELDS = ['email', 'first_name', 'last_name', 'role', 'is_active']
+    # Columns each output field is built from
+    FIELD_VALUES = {
+        'id': ('id',),
+        'name': ('name',),
+        'category': ('category_id',),
+        'serial_number': ('serial_number',),
+        'image': ('image',),
+        'photo': ('photo',),
+        'photo_thumbnail': ('photo', 'image_derivatives'),
+        'assigned_to': ('assigned_to_id',),
+        'assigned_to_detail': ('assigned_to_id', *[f'assigned_to__{field}' for field in USER_FIELDS]),
+        'status': ('status',),
+        'created_at': ('created_at',),
+    }
+    # Always read: cursor pagination needs them to build the next/previous links
+    PAGINATION_VALUES = ('id', 'created_at')
+
+    # Shared converters, same ones AssetSerializer's fields use
+    _datetime = serializers.DateTimeField()
+    _image_storage = Asset._meta.get_field('image').storage
+
+    @classmethod
+    def values_for(cls, fields=None):
+        """
+        Columns to pass to values() for the given output fields (default: all).
         """
-        instance = Asset(**data)
-        # We skip checking 'assigned_to' relations here for simplicity
-        # but we trigger the status checks.
-        if instance.status == 'ASSIGNED' and not data.get('assigned_to'):
-             # Standard DRF validation can go here too
-             pass
-        return data
\ No newline at end of file
+        columns = dict.fromkeys(cls.PAGINATION_VALUES)
+        for field in fields or cls.FIELDS:
+            columns.update(dict.fromkeys(cls.FIELD_VALUES[field]))
+        return tuple(columns)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        build_url = request.build_absolute_uri if request is not None else (lambda url: url)
+        image_url = self._image_storage.url
+        to_datetime = self._datetime.to_representation
+
+        getters = {
+            'id': lambda row: str(row['id']),
+            'name': lambda row: row['name'],
+            'category': lambda row: row['category_id'],
+            'serial_number': lambda row: row['serial_number'],
+            'image': lambda row: build_url(image_url(row['image'])) if row['image'] else None,
+            'photo': lambda row: build_url(image_url(row['photo'])) if row['photo'] else None,
+            'photo_thumbnail': lambda row: self._thumbnail(row, build_url, image_url),
+            'assigned_to': lambda row: row['assigned_to_id'],
+            'assigned_to_detail': self._holder,
+            'status': lambda row: row['status'],
+            'created_at': lambda row: to_datetime(row['created_at']),
+        }
+        fields = self.context.get('fields') or self.FIELDS
+        self._getters = [(field, getters[field]) for field in self.FIELDS if field in fields]
+
+    @staticmethod
+    def _thumbnail(row, build_url, image_url):
+        name = current_derivative(row['photo'], row['image_derivatives'], 'thumb')
+        return build_url(image_url(name)) if name else None
+
+    @staticmethod
+    def _holder(row):
+        holder_id = row['assigned_to_id']
+        if holder_id is None:
+            return None
+        return {
+            'id': holder_id,
+            'email': row['assigned_to__email'],
+            'first_name': row['assigned_to__first_name'],
+            'last_name': row['assigned_to__last_name'],
+            'role': row['assigned_to__role'],
+            'is_active': row['assigned_to__is_active'],
+        }
+
+    def to_representation(self, row):
+        return {field: getter(row) for field, getter in self._getters}
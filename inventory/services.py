@@ -0,0 +1,125 @@
+import uuid
+from django.db import transaction
+from django.utils import timezone
+from .models import Asset
+from .signals import StatusChange, assets_bulk_updated
+
+# action -> (statuses it may start from, status it ends in)
+BULK_ACTIONS = {
+    'checkout': ({Asset.Status.AVAILABLE}, Asset.Status.ASSIGNED),
+    'return': ({Asset.Status.ASSIGNED}, Asset.Status.AVAILABLE),
+    'mark_broken': (
+        {Asset.Status.AVAILABLE, Asset.Status.ASSIGNED, Asset.Status.UNDER_REPAIR},
+        Asset.Status.BROKEN,
+    ),
+    'mark_available': (
+        {Asset.Status.BROKEN, Asset.Status.UNDER_REPAIR},
+        Asset.Status.AVAILABLE,
+    ),
+}
+
+# The dashboard's one-asset buttons accept every source status they always have.
+# An asset already in the target status is a no-op; ARCHIVED -> BROKEN is the one
+# move Asset.TRANSITIONS forbids, so mark_broken still rejects ARCHIVED assets.
+DASHBOARD_ACTIONS = {
+    'mark_broken': (
+        {Asset.Status.AVAILABLE, Asset.Status.ASSIGNED, Asset.Status.BROKEN, Asset.Status.UNDER_REPAIR},
+        Asset.Status.BROKEN,
+    ),
+    'mark_available': (set(Asset.Status.values), Asset.Status.AVAILABLE),
+}
+
+
+def _parse_ids(asset_ids, results):
+    """
+    Drops ids that are not valid UUIDs (reported as failures) and duplicates.
+    """
+    parsed = {}
+    for raw_id in asset_ids:
+        try:
+            parsed[uuid.UUID(str(raw_id))] = raw_id
+        except ValueError:
+            results[str(raw_id)] = "Invalid asset id."
+    return parsed
+
+
+def bulk_transition(asset_ids, action, employee=None, actions=BULK_ACTIONS):
+    """
+    Set-Based State Transition:
+    Moves many assets in one transaction with a fixed number of queries:
+    1. SELECT ... FOR UPDATE the current status of every requested asset.
+    2. One conditional UPDATE (WHERE status IN <allowed sources>) for the eligible ones.
+    3. The assets_bulk_updated receivers write the audit rows in bulk.
+    Every action is a move allowed by Asset.TRANSITIONS, and the Asset
+    CheckConstraints reject any row the UPDATE would leave inconsistent.
+    `actions` is the action table to use (BULK_ACTIONS or DASHBOARD_ACTIONS).
+    Returns {asset_id: None on success, or an error message}.
+    """
+    allowed_from, new_status = actions[action]
+    results = {}
+    ids = _parse_ids(asset_ids, results)
+
+    with transaction.atomic():
+        current = {
+            row[0]: row
+            for row in Asset.objects.select_for_update()
+            .filter(pk__in=ids)
+            .values_list('id', 'status', 'category_id')
+        }
+
+        changes = []
+        for pk, raw_id in ids.items():
+            if pk not in current:
+                results[str(raw_id)] = "Asset not found."
+                continue
+            _, old_status, category_id = current[pk]
+            if old_status not in allowed_from:
+                results[str(raw_id)] = f"Asset is currently {old_status}. Cannot {action.replace('_', ' ')}."
+                continue
+            results[str(raw_id)] = None
+            if old_status == new_status:
+                continue  # Already there (and holder-free, see the CheckConstraints)
+            changes.append(StatusChange(pk, category_id, old_status, new_status))
+
+        if changes:
+            Asset.objects.filter(
+                pk__in=[change.asset_id for change in changes],
+                status__in=allowed_from,
+            ).update_without_invalidation(  # The assets_bulk_updated receivers invalidate these rows
+                status=new_status,
+                assigned_to=employee if new_status == Asset.Status.ASSIGNED else None,
+                updated_at=timezone.now(),
+            )
+            assets_bulk_updated.send(sender=Asset, action=action, changes=changes)
+
+    return results
+
+
+def transition_asset(asset, action, employee=None):
+    """
+    Race-Free Single Transition:
+    A compare-and-set UPDATE ... WHERE id = <asset> AND status = <status we read>.
+    If two admins act on the same asset at once only one UPDATE matches the
+    row; the other gets False back (the caller answers 409 Conflict) instead of
+    silently overwriting the first assignment. No full_clean() on this path:
+    the WHERE clause is the validation.
+    """
+    allowed_from, new_status = BULK_ACTIONS[action]
+    if asset.status not in allowed_from:
+        raise ValueError(f"Cannot {action} an asset that is {asset.status}.")
+
+    assigned_to = employee if new_status == Asset.Status.ASSIGNED else None
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Asset.objects.filter(pk=asset.pk, status=asset.status).update_without_invalidation(
+            status=new_status, assigned_to=assigned_to, updated_at=now,
+        )
+        if not updated:
+            return False
+        change = StatusChange(asset.pk, asset.category_id, asset.status, new_status)
+        assets_bulk_updated.send(sender=Asset, action=action, changes=[change])
+
+    asset.status = new_status
+    asset.assigned_to = assigned_to
+    asset.updated_at = now
+    return True
@@ -0,0 +1,16 @@
+from collections import namedtuple
+from django.dispatch import Signal
+
+# Set-based writes (bulk_create / QuerySet.update) skip Asset.save(), so the
+# regular post_save receivers never see them. These signals are sent instead.
+
+# Sent after assets are inserted with bulk_create.
+# Arguments: assets (list of saved Asset instances)
+assets_bulk_created = Signal()
+
+# One row touched by a set-based status update.
+StatusChange = namedtuple('StatusChange', ['asset_id', 'category_id', 'old_status', 'new_status'])
+
+# Sent after a QuerySet.update() changed the status of some assets.
+# Arguments: action (e.g. "checkout"), changes (list of StatusChange)
+assets_bulk_updated = Signal()
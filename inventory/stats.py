@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from .models import Asset, InventorySummary
+
+User = get_user_model()
+
+# Dashboard counters and the Asset.Status value each one counts.
+STATUS_COUNTERS = {
+    'assigned': Asset.Status.ASSIGNED,
+    'available': Asset.Status.AVAILABLE,
+    'broken': Asset.Status.BROKEN,
+}
+
+
+def get_inventory_stats():
+    """
+    Stats Engine:
+    Builds every dashboard number with a fixed number of queries.
+    1. One read of InventorySummary (asset counts per category and status,
+       maintained incrementally, see inventory/summary.py), joined to the
+       category names. Its size depends on the number of categories, not assets.
+    2. One COUNT on users.
+    Totals are summed in Python from the per-category rows.
+    """
+    rows = (
+        InventorySummary.objects
+        .exclude(count=0)
+        .values_list('category_id', 'category__name', 'status', 'count')
+        .order_by('category_id')
+    )
+
+    stats = {'total': 0, **{key: 0 for key in STATUS_COUNTERS}}
+    keys_by_status = {value: key for key, value in STATUS_COUNTERS.items()}
+    totals_by_category = {}  # category_id -> [name, total], in category order
+    for category_id, category_name, status, count in rows:
+        stats['total'] += count
+        if status in keys_by_status:
+            stats[keys_by_status[status]] += count
+        totals_by_category.setdefault(category_id, [category_name, 0])[1] += count
+
+    stats['user_count'] = User.objects.count()
+
+    return {
+        'stats': stats,
+        'graph_labels': [name for name, _ in totals_by_category.values()],
+        'graph_data': [total for _, total in totals_by_category.values()],
+    }
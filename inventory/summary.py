@@ -0,0 +1,118 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from .models import Asset, InventorySummary
+
+
+def _matching(keys):
+    condition = Q()
+    for category_id, status in keys:
+        condition |= Q(category_id=category_id, status=status)
+    return condition
+
+
+def _add(deltas):
+    """
+    One UPDATE ... SET count = count + CASE ... for every row in `deltas`.
+    Returns the number of rows that existed.
+    """
+    return InventorySummary.objects.filter(_matching(deltas)).update(count=F('count') + Case(
+        *[When(_matching([key]), then=Value(delta)) for key, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+
+
+def apply_deltas(deltas):
+    """
+    Incremental Maintenance:
+    `deltas` maps (category_id, status) -> change in the number of assets.
+    Usually a single UPDATE. The first asset of a category creates the rows
+    of all its statuses with count 0, which are then incremented
+    (ignore_conflicts, so two writers creating the same row do not fail).
+    Decrements of missing rows are dropped: the row is gone because its
+    category is being deleted (CASCADE).
+    `manage.py rebuild_inventory_summary --verify` reports any drift.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas or _add(deltas) == len(deltas):
+        return
+
+    existing = set(
+        InventorySummary.objects.filter(_matching(deltas)).values_list('category_id', 'status')
+    )
+    missing = {key: delta for key, delta in deltas.items() if key not in existing and delta > 0}
+    if missing:
+        # Every status of the category at once, so its later transitions stay a single UPDATE
+        InventorySummary.objects.bulk_create(
+            [
+                InventorySummary(category_id=category_id, status=status)
+                for category_id in {category_id for category_id, _ in missing}
+                for status in Asset.Status.values
+            ],
+            ignore_conflicts=True,
+        )
+        _add(missing)
+
+
+def deltas_between(before, after):
+    """
+    Deltas of a QuerySet.update(): `before` and `after` map asset id -> (category_id, status).
+    """
+    deltas = Counter()
+    for pk, key in before.items():
+        deltas[key] -= 1
+        if pk in after:
+            deltas[after[pk]] += 1
+    return deltas
+
+
+def deltas_for_changes(changes):
+    """
+    Deltas of a set-based status update (inventory.signals.StatusChange list).
+    """
+    deltas = Counter()
+    for change in changes:
+        deltas[(change.category_id, change.old_status)] -= 1
+        deltas[(change.category_id, change.new_status)] += 1
+    return deltas
+
+
+def source_counts():
+    """
+    The source of truth: {(category_id, status): count} straight from the Asset table.
+    """
+    rows = Asset.objects.values('category_id', 'status').annotate(count=Count('id')).order_by()
+    return {(row['category_id'], row['status']): row['count'] for row in rows}
+
+
+def summary_counts():
+    rows = InventorySummary.objects.exclude(count=0).values_list('category_id', 'status', 'count')
+    return {(category_id, status): count for category_id, status, count in rows}
+
+
+def verify_summary():
+    """
+    [(category_id, status, summary count, actual count)] for every row that is off.
+    """
+    actual, summary = source_counts(), summary_counts()
+    return sorted(
+        (category_id, status, summary.get((category_id, status), 0), actual.get((category_id, status), 0))
+        for category_id, status in actual.keys() | summary.keys()
+        if summary.get((category_id, status), 0) != actual.get((category_id, status), 0)
+    )
+
+
+def rebuild_summary():
+    """
+    Recounts everything from the Asset table. Returns the number of rows written.
+    """
+    with transaction.atomic():
+        counts = source_counts()
+        InventorySummary.objects.all().delete()
+        rows = InventorySummary.objects.bulk_create([
+            InventorySummary(category_id=category_id, status=status, count=counts.get((category_id, status), 0))
+            for category_id in {category_id for category_id, _ in counts}
+            for status in Asset.Status.values
+        ])
+    return len(rows)
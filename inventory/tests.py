@@ -1,11 +1,44 @@
+import csv
+import gzip
+import io
+import json
+import os
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command, CommandError
+from django.db import connection, IntegrityError, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from PIL import Image
 from rest_framework import status
-from rest_framework.test import APITestCase
-from django.contrib.auth import get_user_model
-from .models import Asset, Category
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from audit.models import AuditLog
+from common.pagination import BoundedCursorPagination
+from common.testing import TempDirMixin
+from .benchmarks import run_benchmarks
+from .fleet import seed_fleet
+from .importers import AssetImporter
+from .labels import compose_label_sheets, generate_qr_codes
+from .models import Asset, AssetQuerySet, Category, InventorySummary
+from .search import AssetSearchFilter, PostgresSearchBackend, SimpleSearchBackend, SQLiteFTSSearchBackend
+from .serializers import AssetReadSerializer, AssetSerializer
+from .services import BULK_ACTIONS, bulk_transition, transition_asset
+from .stats import get_inventory_stats
+from .summary import verify_summary
+from .views import AssetViewSet
 
 User = get_user_model()
 
+# /api/token/ hashes the password, slow on purpose: keep it out of the slow request log
+@override_settings(SQL_INSTRUMENTATION={**settings.SQL_INSTRUMENTATION, 'SLOW_REQUEST_MS': 10 ** 6})
 class AssetFlowTests(APITestCase):
     def setUp(self):
         # 1. Setup the "World" (Admin, Employee, Category, Asset)
@@ -82,4 +115,796 @@ class AssetFlowTests(APITestCase):
         # 3. Check: Did it fail with a 400 Bad Request?
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("Cannot check out", response.data['error'])
-        print("\n✅ API Security Test: Broken assets correctly blocked from checkout.")
\ No newline at end of file
+        print("\n✅ API Security Test: Broken assets correctly blocked from checkout.")
+
+class InventoryStatsTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+
+    def _create_assets(self, category_count):
+        for i in range(category_count):
+            category = Category.objects.create(name=f"Category {i}")
+            Asset.objects.create(name=f"Laptop {i}", serial_number=f"SN-{i}", category=category)
+
+    def test_stats_numbers(self):
+        """
+        Totals and per-category graph data match the raw rows.
+        """
+        self._create_assets(2)
+        broken = Asset.objects.get(serial_number="SN-1")
+        broken.status = Asset.Status.BROKEN
+        broken.save()
+
+        response = self.client.get(reverse('inventory-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stats'], {
+            'total': 2, 'assigned': 0, 'available': 1, 'broken': 1, 'user_count': 1,
+        })
+        self.assertEqual(response.data['graph_labels'], ["Category 0", "Category 1"])
+        self.assertEqual(response.data['graph_data'], [1, 1])
+
+    def test_stats_query_count_is_fixed(self):
+        """
+        The number of queries must not grow with the number of categories.
+        """
+        self._create_assets(3)
+        with self.assertNumQueries(2):
+            get_inventory_stats()
+
+        Category.objects.all().delete()
+        self._create_assets(30)
+        with self.assertNumQueries(2):
+            get_inventory_stats()
+
+
+class AssetPaginationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        category = Category.objects.create(name="Phones")
+        for i in range(5):
+            Asset.objects.create(name=f"Phone {i}", serial_number=f"PH-{i}", category=category)
+
+    def test_cursor_pages_are_stable_under_inserts(self):
+        """
+        Rows created while a client is paging must not shift or repeat results.
+        """
+        response = self.client.get(reverse('asset-list'), {'page_size': 2})
+        seen = [row['serial_number'] for row in response.data['results']]
+        next_url = response.data['next']
+
+        Asset.objects.create(name="Late Phone", serial_number="PH-late", category=Category.objects.get())
+
+        while next_url:
+            response = self.client.get(next_url)
+            seen += [row['serial_number'] for row in response.data['results']]
+            next_url = response.data['next']
+
+        self.assertEqual(sorted(seen), [f"PH-{i}" for i in range(5)])
+
+    def test_page_size_is_bounded(self):
+        with mock.patch.object(BoundedCursorPagination, 'max_page_size', 3):
+            response = self.client.get(reverse('asset-list'), {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 3)
+
+
+class AssetImportTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        self.category = Category.objects.create(name="Laptops")
+        Asset.objects.create(name="Old Laptop", serial_number="EXISTING", category=self.category)
+
+    def _upload(self, name, content):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post(reverse('asset-bulk-import'), {'file': upload}, format='multipart')
+
+    def test_csv_import_reports_bad_rows(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._upload("shipment.csv", "\n".join([
+                "name,serial_number,category,status",
+                "Laptop A,NEW-1,Laptops,",
+                "Laptop B,NEW-2,Laptops,BROKEN",
+                "Laptop C,EXISTING,Laptops,",
+                "Laptop D,NEW-1,Laptops,",
+                "Laptop E,NEW-3,Tablets,",
+                "Laptop F,NEW-4,Laptops,LOST",
+            ]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [4, 5, 6, 7])
+        self.assertEqual(Asset.objects.get(serial_number="NEW-2").status, Asset.Status.BROKEN)
+        self.assertEqual(AuditLog.objects.filter(action="CREATED").count(), 2)
+
+    def test_jsonl_import_uses_set_based_queries(self):
+        """
+        One chunk costs a fixed number of queries, however many rows it holds.
+        """
+        lines = "\n".join(
+            json.dumps({"name": f"Phone {i}", "serial_number": f"PH-{i}", "category": "Laptops"})
+            for i in range(50)
+        )
+        # category lookup + serial check + asset INSERT (+ savepoint) + summary UPDATE
+        # + audit INSERT after commit
+        with self.assertNumQueries(7), self.captureOnCommitCallbacks(execute=True):
+            result = AssetImporter().run(io.BytesIO(lines.encode()), 'jsonl')
+        self.assertEqual(result.created, 50)
+        self.assertEqual(result.errors, [])
+
+    def test_non_utf8_file_is_rejected_before_any_row(self):
+        content = b"name,serial_number,category\nLaptop A,NEW-1,Laptops\n" + b"Laptop \xe9,NEW-2,Laptops\n"
+        upload = SimpleUploadedFile("shipment.csv", content)
+        response = self.client.post(reverse('asset-bulk-import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("UTF-8", response.data['error'])
+
+        with self.assertRaises(ValueError):
+            AssetImporter(chunk_size=1).run(io.BytesIO(content), 'csv')
+        self.assertFalse(Asset.objects.filter(serial_number__startswith="NEW-").exists())
+
+    def test_other_integrity_errors_become_row_errors(self):
+        real_bulk_create = AssetQuerySet.bulk_create
+
+        def bulk_create(queryset, objs, *args, **kwargs):
+            if any(asset.serial_number == "NEW-2" for asset in objs):
+                raise IntegrityError("simulated constraint violation")
+            return real_bulk_create(queryset, objs, *args, **kwargs)
+
+        lines = "\n".join(["name,serial_number,category"] + [f"Laptop {i},NEW-{i},Laptops" for i in range(1, 4)])
+        with mock.patch.object(AssetQuerySet, 'bulk_create', bulk_create):
+            result = AssetImporter().run(io.BytesIO(lines.encode()), 'csv')
+        self.assertEqual(result.created, 2)
+        self.assertEqual([(error['line'], error['serial_number']) for error in result.errors], [(3, "NEW-2")])
+        self.assertEqual(
+            set(Asset.objects.filter(serial_number__startswith="NEW-").values_list('serial_number', flat=True)),
+            {"NEW-1", "NEW-3"},
+        )
+
+
+class BulkActionTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.employee = User.objects.create_user(email='employee@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        self.category = Category.objects.create(name="Monitors")
+        self.assets = [
+            Asset.objects.create(name=f"Monitor {i}", serial_number=f"MON-{i}", category=self.category)
+            for i in range(4)
+        ]
+
+    def test_bulk_checkout_reports_per_asset_results(self):
+        self.assets[0].status = Asset.Status.BROKEN
+        self.assets[0].save()
+        ids = [str(asset.id) for asset in self.assets] + ["not-a-uuid"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('asset-bulk-checkout'),
+                {'asset_ids': ids, 'employee_id': self.employee.id},
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 3)
+        failed = {row['id'] for row in response.data['results'] if row['status'] == 'failed'}
+        self.assertEqual(failed, {str(self.assets[0].id), "not-a-uuid"})
+        self.assertEqual(
+            Asset.objects.filter(assigned_to=self.employee, status=Asset.Status.ASSIGNED).count(), 3
+        )
+        self.assertEqual(AuditLog.objects.filter(action="ASSIGNED").count(), 3)
+
+    def test_bulk_return_query_count_does_not_grow(self):
+        Asset.objects.update(status=Asset.Status.ASSIGNED, assigned_to=self.employee)
+        # savepoint + SELECT FOR UPDATE + UPDATE + summary UPDATE + release + audit INSERT after commit
+        with self.assertNumQueries(6), self.captureOnCommitCallbacks(execute=True):
+            bulk_transition([self.assets[0].id], 'return')
+        with self.assertNumQueries(6), self.captureOnCommitCallbacks(execute=True):
+            bulk_transition([asset.id for asset in self.assets[1:]], 'return')
+        self.assertFalse(Asset.objects.filter(assigned_to__isnull=False).exists())
+
+    def test_bulk_checkout_rejects_non_integer_employee_id(self):
+        response = self.client.post(
+            reverse('asset-bulk-checkout'),
+            {'asset_ids': [str(self.assets[0].id)], 'employee_id': 'abc'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Asset.objects.filter(status=Asset.Status.ASSIGNED).exists())
+
+    def test_dashboard_buttons_keep_their_source_statuses(self):
+        self.client.force_login(self.admin)
+        assigned, available, archived, broken = self.assets
+        Asset.objects.filter(pk=assigned.pk).update(status=Asset.Status.ASSIGNED, assigned_to=self.employee)
+        Asset.objects.filter(pk=archived.pk).update(status=Asset.Status.ARCHIVED)
+        Asset.objects.filter(pk=broken.pk).update(status=Asset.Status.BROKEN)
+
+        # mark_available works from any status, clearing the holder
+        for asset in (assigned, available, archived):
+            self.client.post(reverse('mark_available', args=[asset.id]))
+            asset.refresh_from_db()
+            self.assertEqual(asset.status, Asset.Status.AVAILABLE)
+            self.assertIsNone(asset.assigned_to_id)
+
+        # mark_broken works from any status Asset.TRANSITIONS allows (not ARCHIVED)
+        Asset.objects.filter(pk=assigned.pk).update(status=Asset.Status.ASSIGNED, assigned_to=self.employee)
+        Asset.objects.filter(pk=archived.pk).update(status=Asset.Status.ARCHIVED)
+        for asset in (assigned, available, broken):
+            self.client.post(reverse('mark_broken', args=[asset.id]))
+            asset.refresh_from_db()
+            self.assertEqual(asset.status, Asset.Status.BROKEN)
+            self.assertIsNone(asset.assigned_to_id)
+        self.client.post(reverse('mark_broken', args=[archived.id]))
+        archived.refresh_from_db()
+        self.assertEqual(archived.status, Asset.Status.ARCHIVED)
+
+
+class CheckoutRaceTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.first = User.objects.create_user(email='first@test.com', password='password123')
+        self.second = User.objects.create_user(email='second@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        self.asset = Asset.objects.create(
+            name="Laptop", serial_number="RACE-1", category=Category.objects.create(name="Laptops")
+        )
+
+    def test_losing_checkout_gets_409(self):
+        """
+        Both requests read AVAILABLE; only the first UPDATE may win.
+        """
+        stale = Asset.objects.get(pk=self.asset.pk)
+        self.client.post(
+            reverse('asset-checkout', args=[self.asset.id]), {'employee_id': self.first.id}, format='json'
+        )
+
+        with mock.patch.object(AssetViewSet, 'get_object', return_value=stale):
+            response = self.client.post(
+                reverse('asset-checkout', args=[self.asset.id]), {'employee_id': self.second.id}, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.assigned_to, self.first)
+
+    def test_checkout_is_a_single_update(self):
+        # savepoint + conditional UPDATE + summary UPDATE + release + audit INSERT;
+        # no full_clean() SELECTs
+        with self.assertNumQueries(5), self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(transition_asset(self.asset, 'checkout', employee=self.first))
+
+
+class AssetHistoryTests(APITestCase):
+    def setUp(self):
+        self.employee = User.objects.create_user(email='employee@test.com', password='password123')
+        self.client.force_authenticate(user=self.employee)
+        category = Category.objects.create(name="Laptops")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.asset = Asset.objects.create(name="Laptop", serial_number="HIST-1", category=category)
+            Asset.objects.create(name="Other", serial_number="HIST-2", category=category)
+            self.asset.status = Asset.Status.BROKEN
+            self.asset.save()
+
+    def test_history_lists_only_this_asset(self):
+        response = self.client.get(reverse('asset-history', args=[self.asset.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['action'] for row in response.data['results']], ["UPDATED", "CREATED"])
+        self.assertEqual({row['object_id'] for row in response.data['results']}, {str(self.asset.id)})
+
+
+class AssetSearchTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.holder = User.objects.create_user(email='jane.doe@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        category = Category.objects.create(name="Laptops")
+        self.xps = Asset.objects.create(name="Dell XPS 15", serial_number="SN-998877", category=category)
+        self.mac = Asset.objects.create(name="MacBook Pro", serial_number="MBP-1234", category=category)
+        Asset.objects.filter(pk=self.mac.pk).update(assigned_to=self.holder, status=Asset.Status.ASSIGNED)
+
+    def _search(self, query):
+        response = self.client.get(reverse('asset-list'), {'search': query})
+        return [row['serial_number'] for row in response.data['results']]
+
+    def test_substring_and_short_terms(self):
+        self.assertEqual(self._search("9988"), ["SN-998877"])
+        self.assertEqual(self._search("xps 15"), ["SN-998877"])
+        self.assertEqual(self._search("nothing-like-this"), [])
+
+    def test_index_follows_asset_and_user_changes(self):
+        """
+        Set-based updates and holder email changes reach the index too.
+        """
+        self.assertEqual(self._search("jane.doe"), ["MBP-1234"])
+
+        self.holder.email = "j.smith@test.com"
+        self.holder.save()
+        self.assertEqual(self._search("jane.doe"), [])
+        self.assertEqual(self._search("smith"), ["MBP-1234"])
+
+        Asset.objects.filter(pk=self.xps.pk).update(name="Dell Latitude")
+        self.assertEqual(self._search("latitude"), ["SN-998877"])
+
+        self.mac.delete()
+        self.assertEqual(self._search("MBP"), [])
+
+    def test_every_match_is_paged_in_the_database(self):
+        category = Category.objects.get(name="Laptops")
+        Asset.objects.bulk_create([
+            Asset(name=f"Dock {i}", serial_number=f"DOCK-{i}", category=category) for i in range(7)
+        ])
+        serials = []
+        url = reverse('asset-list') + '?search=dock&page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data['results']), 3)
+            serials += [row['serial_number'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(sorted(serials), sorted(f"DOCK-{i}" for i in range(7)))
+
+    def test_unranked_searches_keep_the_created_at_keyset(self):
+        request = Request(APIRequestFactory().get('/', {'search': 'xp'}))
+        with mock.patch.object(SQLiteFTSSearchBackend, '_uses_trigrams', return_value=True):
+            self.assertFalse(SQLiteFTSSearchBackend().ranks("xp 15"))
+            self.assertTrue(SQLiteFTSSearchBackend().ranks("xps 15"))
+        self.assertFalse(SimpleSearchBackend().ranks("xps"))
+        with mock.patch('inventory.search.get_search_backend', return_value=SimpleSearchBackend()):
+            self.assertIsNone(AssetSearchFilter().get_ordering(request, Asset.objects.all(), None))
+
+    @skipUnless(connection.vendor == 'postgresql', "PostgresSearchBackend needs PostgreSQL with pg_trgm")
+    def test_postgres_backend_filters_and_ranks(self):
+        category = Category.objects.get(name="Laptops")
+        Asset.objects.create(name="Dell XPS 15 refurbished spare unit", serial_number="SN-112233", category=category)
+        backend = PostgresSearchBackend()
+
+        ranked = backend.search(Asset.objects.all(), "dell xps 15").order_by('search_rank')
+        self.assertEqual([asset.serial_number for asset in ranked], ["SN-998877", "SN-112233"])
+        holder = backend.search(Asset.objects.all(), "jane.doe")
+        self.assertEqual([asset.serial_number for asset in holder], ["MBP-1234"])
+        self.assertEqual(self._search("MBP-12"), ["MBP-1234"])
+
+
+class AssetExportTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        category = Category.objects.create(name="Laptops")
+        for i in range(3):
+            Asset.objects.create(name=f"Laptop {i}", serial_number=f"SN-{i}", category=category)
+        Asset.objects.filter(serial_number="SN-2").update(status=Asset.Status.BROKEN)
+
+    def _download(self, **params):
+        response = self.client.get(reverse('asset-export'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv_export_with_filter(self):
+        rows = list(csv.DictReader(io.StringIO(self._download(status='available').decode())))
+        self.assertEqual([row['serial_number'] for row in rows], ["SN-0", "SN-1"])
+        self.assertEqual(rows[0]['category'], "Laptops")
+
+    def test_gzip_jsonl_export(self):
+        lines = gzip.decompress(self._download(file_format='jsonl', gzip='1')).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[2])['status'], "BROKEN")
+
+        response = self.client.get(reverse('asset-export'), {'file_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_export_is_not_truncated(self):
+        category = Category.objects.get(name="Laptops")
+        Asset.objects.bulk_create([
+            Asset(name=f"Monitor {i}", serial_number=f"MON-{i}", category=category) for i in range(1001)
+        ])
+        # More rows than search used to return (the former 1000-hit ASSET_SEARCH_LIMIT)
+        lines = self._download(file_format='jsonl', search='monitor').decode().splitlines()
+        self.assertEqual(len(lines), 1001)
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        self.category = Category.objects.create(name="Laptops")
+        self.asset = Asset.objects.create(name="Laptop", serial_number="SN-1", category=self.category)
+
+    def test_unchanged_list_gets_304(self):
+        url = reverse('asset-list')
+        etag = self.client.get(url)['ETag']
+
+        with mock.patch('inventory.views.AssetReadSerializer') as serializer:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        serializer.assert_not_called()
+
+        # A new row changes the validator, so does a different query string
+        Asset.objects.create(name="Phone", serial_number="SN-2", category=self.category)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.client.get(url, {'search': 'SN'}, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK
+        )
+
+    def test_detail_validators_follow_updated_at(self):
+        url = reverse('asset-detail', args=[self.asset.id])
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+        # update() leaves the asset's updated_at alone, but the nested holder changed
+        employee = User.objects.create_user(email='employee@test.com', password='password123')
+        Asset.objects.filter(pk=self.asset.pk).update(assigned_to=employee, status=Asset.Status.ASSIGNED)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.holder = User.objects.create_user(email='jane@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        self.category = Category.objects.create(name="Laptops")
+        self.asset = Asset.objects.create(
+            name="Laptop", serial_number="SN-1", category=self.category,
+            assigned_to=self.holder, status=Asset.Status.ASSIGNED,
+        )
+
+    def test_list_is_served_from_cache_until_a_write(self):
+        url = reverse('asset-list')
+        self.assertEqual(self.client.get(url, {'a': 1, 'b': 2})['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'b': 2, 'a': 1})  # Same parameters, other order
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        Asset.objects.create(name="Phone", serial_number="SN-2", category=self.category)
+        response = self.client.get(url, {'a': 1, 'b': 2})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_holder_change_invalidates_only_their_assets(self):
+        other = Asset.objects.create(name="Phone", serial_number="SN-2", category=self.category)
+        url = reverse('asset-detail', args=[self.asset.id])
+        other_url = reverse('asset-detail', args=[other.id])
+        self.client.get(url)
+        self.client.get(other_url)
+
+        self.holder.first_name = "Jane"
+        self.holder.save()
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['assigned_to_detail']['first_name'], "Jane")
+        self.assertEqual(self.client.get(other_url)['X-Cache'], 'HIT')
+
+    def test_bare_update_drops_cached_responses(self):
+        url = reverse('asset-detail', args=[self.asset.id])
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        Asset.objects.filter(pk=self.asset.pk).update(name="Renamed")
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['name'], "Renamed")
+
+    def test_transition_keeps_other_assets_cached(self):
+        other = Asset.objects.create(name="Phone", serial_number="SN-2", category=self.category)
+        other_url = reverse('asset-detail', args=[other.id])
+        self.client.get(other_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_asset(self.asset, 'return')
+        self.assertEqual(self.client.get(reverse('asset-detail', args=[self.asset.id]))['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(other_url)['X-Cache'], 'HIT')
+
+
+class AssetReadSerializerTests(APITestCase):
+    def test_output_is_identical_to_asset_serializer(self):
+        holder = User.objects.create_user(email='jane@test.com', password='x', first_name="Jane")
+        category = Category.objects.create(name="Laptops")
+        Asset.objects.create(
+            name="Laptop é", serial_number="SN-1", category=category,
+            image='assets/qr_codes/a.png', photo='assets/photos/a.jpg',
+        )
+        Asset.objects.create(
+            name="Phone", serial_number="SN-2", category=category, assigned_to=holder, status=Asset.Status.ASSIGNED
+        )
+        context = {'request': Request(APIRequestFactory().get('/api/assets/'))}
+        assets = Asset.objects.order_by('serial_number')
+
+        expected = JSONRenderer().render(AssetSerializer(assets, many=True, context=context).data)
+        rows = assets.values(*AssetReadSerializer.values_for())
+        self.assertEqual(JSONRenderer().render(AssetReadSerializer(rows, many=True, context=context).data), expected)
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        category = Category.objects.create(name="Laptops")
+        self.asset = Asset.objects.create(
+            name="Laptop", serial_number="SN-1", category=category,
+            assigned_to=self.admin, status=Asset.Status.ASSIGNED,
+        )
+
+    def test_fields_trim_payload_and_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('asset-list'), {'fields': 'id,serial_number,status'})
+        self.assertEqual(list(response.data['results'][0]), ['id', 'serial_number', 'status'])
+        self.assertFalse(any('users_user' in query['sql'] for query in queries.captured_queries))
+
+        response = self.client.get(
+            reverse('asset-detail', args=[self.asset.id]), {'fields': 'serial_number', 'expand': 'assigned_to'}
+        )
+        self.assertEqual(response.data['assigned_to_detail']['email'], 'admin@test.com')
+        self.assertNotIn('name', response.data)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('asset-list'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('asset-list'), {'expand': 'category'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QRLabelTests(TempDirMixin, APITestCase):
+    def setUp(self):
+        self.media = self.make_temp_dir()
+        self.enable_settings(MEDIA_ROOT=self.media)
+
+        category = Category.objects.create(name="Laptops")
+        for i in range(3):
+            Asset.objects.create(name=f"Laptop {i}", serial_number=f"SN-{i}", category=category)
+
+    def test_codes_are_content_addressed(self):
+        self.assertEqual(generate_qr_codes(workers=1).rendered, 3)
+        self.assertTrue(all(Asset.objects.values_list('image', flat=True)))
+
+        # Nothing changed: nothing is rendered or written again
+        result = generate_qr_codes(workers=1)
+        self.assertEqual((result.rendered, result.unchanged), (0, 3))
+
+        # A hand-made image is left alone
+        Asset.objects.filter(serial_number="SN-0").update(image='assets/qr_codes/custom.png')
+        self.assertEqual(generate_qr_codes(workers=1).skipped, 1)
+
+    def test_label_sheet_pdf(self):
+        path = os.path.join(self.media, 'labels.pdf')
+        self.assertEqual(compose_label_sheets(Asset.objects.all(), path, columns=1, rows=2), 2)
+        with open(path, 'rb') as handle:
+            self.assertTrue(handle.read().startswith(b'%PDF'))
+
+    def test_labels_never_print_a_custom_image(self):
+        Asset.objects.filter(serial_number="SN-0").update(image='assets/qr_codes/custom.png')
+        opened = []
+        storage_open = default_storage.open
+
+        def tracking_open(name, *args, **kwargs):
+            opened.append(name)
+            return storage_open(name, *args, **kwargs)
+
+        with mock.patch.object(default_storage, 'open', side_effect=tracking_open):
+            compose_label_sheets(Asset.objects.all(), os.path.join(self.media, 'labels.pdf'), columns=1, rows=3)
+        self.assertEqual(len(opened), 2)  # The two generated codes; SN-0's is rendered in memory
+        self.assertNotIn('assets/qr_codes/custom.png', opened)
+
+
+class ImageDerivativeTests(TempDirMixin, APITestCase):
+    def setUp(self):
+        self.enable_settings(MEDIA_ROOT=self.make_temp_dir(), IMAGE_DERIVATIVES={
+            'MODE': 'sync', 'WORKERS': 1, 'SIZES': {'thumb': (160, 160), 'medium': (640, 640)}, 'QUALITY': 80,
+        })
+
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        self.asset = Asset.objects.create(
+            name="Laptop", serial_number="SN-1", category=Category.objects.create(name="Laptops"),
+        )
+
+    def _photo(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (2000, 1500), 'red').save(buffer, format='JPEG')
+        return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_gets_fingerprinted_webp_thumbnail(self):
+        url = reverse('asset-detail', args=[self.asset.id])
+        response = self.client.patch(url, {'photo': self._photo()}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.asset.refresh_from_db()
+        derivatives = self.asset.image_derivatives
+        self.assertEqual(derivatives['source'], self.asset.photo.name)
+        self.assertRegex(derivatives['thumb'], r'^assets/derivatives/thumb-[0-9a-f]{20}\.webp$')
+        with default_storage.open(derivatives['thumb']) as handle:
+            self.assertEqual(Image.open(handle).size, (160, 120))
+
+        thumbnail = self.client.get(reverse('asset-list')).data['results'][0]['photo_thumbnail']
+        self.assertTrue(thumbnail.endswith(derivatives['thumb']))
+
+    def test_stale_derivatives_are_not_served(self):
+        Asset.objects.filter(pk=self.asset.pk).update(
+            photo='assets/photos/new.png',
+            image_derivatives={'source': 'assets/photos/old.png', 'thumb': 'assets/derivatives/thumb-x.webp'},
+        )
+        self.asset.refresh_from_db()
+        self.assertIsNone(self.asset.thumbnail_url)
+
+    def test_photo_upload_keeps_the_qr_code(self):
+        generate_qr_codes(workers=1)
+        qr_code = Asset.objects.get(pk=self.asset.pk).image.name
+        url = reverse('asset-detail', args=[self.asset.id])
+        self.client.patch(url, {'photo': self._photo()}, format='multipart')
+
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.image.name, qr_code)
+        self.assertTrue(self.asset.photo.name.startswith('assets/photos/'))
+        result = generate_qr_codes(workers=1, force=True)
+        self.assertEqual((result.unchanged, result.skipped), (1, 0))
+
+
+class AssetSaveValidationTests(APITestCase):
+    def setUp(self):
+        self.employee = User.objects.create_user(email='employee@test.com', password='password123')
+        self.category = Category.objects.create(name="Laptops")
+        Asset.objects.create(name="Laptop A", serial_number="SN-A", category=self.category)
+        Asset.objects.create(name="Laptop B", serial_number="SN-B", category=self.category)
+
+    def test_status_change_skips_unchanged_field_checks(self):
+        asset = Asset.objects.get(serial_number="SN-A")
+        asset.status = Asset.Status.BROKEN
+        with CaptureQueriesContext(connection) as queries:
+            asset.save()
+        selects = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(selects, [])  # No serial uniqueness check, no category lookup
+        self.assertEqual(Asset.objects.get(pk=asset.pk).status, Asset.Status.BROKEN)
+
+    def test_changed_fields_are_still_validated(self):
+        asset = Asset.objects.get(serial_number="SN-A")
+        asset.serial_number = "SN-B"
+        with self.assertRaises(ValidationError):
+            asset.save()
+
+        asset = Asset.objects.get(serial_number="SN-A")
+        asset.status = Asset.Status.UNDER_REPAIR
+        asset.assigned_to = self.employee
+        with self.assertRaises(ValidationError):
+            asset.save()
+
+    def test_status_set_by_clean_is_saved_with_update_fields(self):
+        asset = Asset.objects.get(serial_number="SN-A")
+        asset.assigned_to = self.employee
+        asset.save(update_fields=['assigned_to'])
+        self.assertEqual(Asset.objects.get(pk=asset.pk).status, Asset.Status.ASSIGNED)
+
+
+class AssetStateConstraintTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.client.force_authenticate(user=self.admin)
+        self.asset = Asset.objects.create(
+            name="Laptop", serial_number="SN-1", category=Category.objects.create(name="Laptops"),
+        )
+
+    def test_database_rejects_holder_on_unassigned_asset(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Asset.objects.filter(pk=self.asset.pk).update(status=Asset.Status.BROKEN, assigned_to=self.admin)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Asset.objects.filter(pk=self.asset.pk).update(status='LOST')
+
+    def test_api_rejects_invalid_transition(self):
+        Asset.objects.filter(pk=self.asset.pk).update(status=Asset.Status.ARCHIVED)
+        url = reverse('asset-detail', args=[self.asset.id])
+
+        response = self.client.patch(url, {'status': 'BROKEN'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('status', response.data)
+
+        response = self.client.patch(url, {'status': 'AVAILABLE'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_actions_follow_transition_table(self):
+        for action, (allowed_from, new_status) in BULK_ACTIONS.items():
+            for old_status in allowed_from:
+                self.assertIn(new_status, Asset.TRANSITIONS[old_status], action)
+
+
+class FleetBenchmarkTests(APITestCase):
+    def test_seed_fleet_grows_the_fleet(self):
+        first = seed_fleet(40, history=2)
+        second = seed_fleet(10, history=2)
+        self.assertEqual((first.assets, first.users, second.assets), (40, 4, 10))
+        self.assertEqual(Asset.objects.filter(serial_number__startswith='FLEET-').count(), 50)
+        self.assertEqual(AuditLog.objects.count(), 100)
+        # Seeded rows respect the state machine constraints
+        self.assertFalse(Asset.objects.filter(assigned_to__isnull=False).exclude(status=Asset.Status.ASSIGNED).exists())
+
+    def test_report_has_latency_queries_and_memory(self):
+        admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        report = run_benchmarks([30], admin, requests=2, scenarios=['api_assets_list', 'api_checkout', 'api_return'])
+        results = report['sizes']['30']['scenarios']
+        self.assertEqual(set(results), {'api_assets_list', 'api_checkout', 'api_return'})
+        for result in results.values():
+            self.assertEqual(result['errors'], 0)
+            self.assertGreater(result['queries'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+
+class InventorySummaryTests(APITestCase):
+    def setUp(self):
+        self.employee = User.objects.create_user(email='employee@test.com', password='password123')
+        self.laptops = Category.objects.create(name="Laptops")
+        self.phones = Category.objects.create(name="Phones")
+        self.assets = [
+            Asset.objects.create(name=f"Laptop {i}", serial_number=f"SUM-{i}", category=self.laptops)
+            for i in range(3)
+        ]
+
+    def assertSummaryMatches(self):
+        self.assertEqual(verify_summary(), [])
+
+    def test_follows_save_delete_and_bulk_changes(self):
+        transition_asset(self.assets[0], 'checkout', employee=self.employee)
+        self.assets[1].status = Asset.Status.BROKEN
+        self.assets[1].save()
+        self.assets[2].category = self.phones
+        self.assets[2].save(update_fields=['category'])
+        self.assertSummaryMatches()
+
+        bulk_transition([self.assets[0].id], 'return')
+        self.assets[1].delete()
+        AssetImporter().run(io.BytesIO(b"name,serial_number,category\nPhone,SUM-9,Phones\n"), 'csv')
+        self.assertSummaryMatches()
+
+        self.laptops.delete()  # CASCADE takes the assets and their summary rows
+        self.assertSummaryMatches()
+
+    def test_racing_writes_count_once(self):
+        """
+        Two copies loaded before either write, as in two concurrent PATCHes.
+        """
+        first, second = Asset.objects.get(pk=self.assets[0].pk), Asset.objects.get(pk=self.assets[0].pk)
+        stale = Asset.objects.get(pk=self.assets[0].pk)
+        first.status = second.status = Asset.Status.BROKEN
+        first.save()
+        second.save()
+        self.assertSummaryMatches()
+
+        stale.name = "Renamed"
+        stale.save()  # Also writes its stale AVAILABLE status back over BROKEN
+        self.assertEqual(Asset.objects.get(pk=stale.pk).status, Asset.Status.AVAILABLE)
+        self.assertSummaryMatches()
+
+        first.delete()
+        second.delete()
+        self.assertSummaryMatches()
+
+    def test_stats_read_the_summary(self):
+        Asset.objects.filter(pk=self.assets[0].pk).update(status=Asset.Status.BROKEN)
+        self.assertEqual(get_inventory_stats()['stats']['broken'], 1)
+        self.assertSummaryMatches()
+
+    def test_bare_queryset_updates_keep_the_summary(self):
+        Asset.objects.filter(pk__in=[self.assets[0].pk, self.assets[1].pk]).update(status=Asset.Status.BROKEN)
+        self.assertSummaryMatches()
+        Asset.objects.filter(status=Asset.Status.BROKEN).update(category=self.phones)
+        self.assertSummaryMatches()
+        Asset.objects.filter(category=self.phones).update(
+            category_id=self.laptops.pk, status=Asset.Status.UNDER_REPAIR,
+        )
+        self.assertSummaryMatches()
+        for asset in self.assets:
+            asset.refresh_from_db()
+            asset.status = Asset.Status.ARCHIVED
+        Asset.objects.bulk_update(self.assets, ['status'])
+        self.assertSummaryMatches()
+
+    def test_verify_command(self):
+        InventorySummary.objects.filter(category=self.laptops, status=Asset.Status.BROKEN).update(count=5)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_inventory_summary', '--verify', stdout=io.StringIO())
+        call_command('rebuild_inventory_summary', stdout=io.StringIO())
+        call_command('rebuild_inventory_summary', '--verify', stdout=io.StringIO())
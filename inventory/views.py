@@ -1,41 +1,119 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404,redirect
 from .models import Asset, Category
-from .serializers import AssetSerializer, CategorySerializer
+from .exports import ASSET_EXPORT_COLUMNS, asset_export_queryset
+from .importers import AssetImporter, IMPORT_FORMATS
+from .search import AssetSearchFilter
+from .serializers import AssetReadSerializer, AssetSerializer, CategorySerializer
+from .services import DASHBOARD_ACTIONS, bulk_transition, transition_asset
+from .stats import get_inventory_stats
 from users.permissions import IsAdmin 
+from audit.archive import ARCHIVE_START, archived_history_page, read_archived_history
+from audit.models import AuditLog
+from audit.serializers import AuditLogSerializer
+from common.exporters import EXPORT_FORMATS, export_response
+from common.mixins import ConditionalGetMixin, ResponseCacheMixin
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.contenttypes.models import ContentType
 
 User = get_user_model()
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ResponseCacheMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_namespace = 'categories'
     permission_classes = [IsAdmin] # Only Admins can edit Categories
 
-class AssetViewSet(viewsets.ModelViewSet):
+class AssetViewSet(ResponseCacheMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     # --- THIS WAS MISSING ---
     queryset = Asset.objects.all().select_related('category', 'assigned_to')
     serializer_class = AssetSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'serial_number', 'assigned_to__email']
+    filter_backends = [AssetSearchFilter]  # Indexed + ranked, see inventory/search.py
+    cache_namespace = 'assets'  # Invalidated in inventory/receivers.py
     # ------------------------
 
     def get_permissions(self):
         """
         Custom Logic:
-        - Listing/Retrieving: Allowed for any Authenticated User (Employees)
+        - Listing/Retrieving/History: Allowed for any Authenticated User (Employees)
         - Creating/Deleting/Checkout/Return: Only Admins
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'history']:
             permission_classes = [IsAuthenticated]
         else:
             permission_classes = [IsAdmin]
         return [permission() for permission in permission_classes]
 
+    def _fast_read(self):
+        # The browsable API renders its forms with a cloned POST request: keep those on AssetSerializer
+        return self.action in ['list', 'retrieve'] and self.request.method in ('GET', 'HEAD')
+
+    def _sparse_fields(self):
+        """
+        Sparse fieldsets for list/retrieve:
+        - ?fields=id,serial_number,status -> only these fields, no holder JOIN
+        - ?expand=assigned_to             -> add the nested assigned_to_detail
+        Without either parameter the response is the full one, as before.
+        Returns the selected fields, or None for "everything".
+        """
+        if not hasattr(self, '_selected_fields'):
+            params = self.request.query_params
+            fields = [field for field in params.get('fields', '').split(',') if field]
+            expand = [field for field in params.get('expand', '').split(',') if field]
+
+            selectable = [field for field in AssetReadSerializer.FIELDS if field != 'assigned_to_detail']
+            unknown = [field for field in fields if field not in selectable]
+            if unknown:
+                raise ValidationError({
+                    'fields': f"Unknown field(s): {', '.join(unknown)}. Choose from: {', '.join(selectable)}."
+                })
+            if any(field != 'assigned_to' for field in expand):
+                raise ValidationError({'expand': "Only 'assigned_to' can be expanded."})
+
+            if not fields and not expand:
+                self._selected_fields = None
+            else:
+                self._selected_fields = (fields or selectable) + (['assigned_to_detail'] if expand else [])
+        return self._selected_fields
+
+    @property
+    def conditional_fields(self):
+        # The holder's updated_at only matters when the holder is in the response
+        fields = self._sparse_fields() if self._fast_read() else None
+        if fields is None or 'assigned_to_detail' in fields:
+            return ('updated_at', 'assigned_to__updated_at')
+        return ('updated_at',)
+
+    def get_queryset(self):
+        """
+        list/retrieve read plain rows for the fast AssetReadSerializer path,
+        and only the columns the selected fields need.
+        """
+        queryset = super().get_queryset()
+        if self._fast_read():
+            return queryset.values(*AssetReadSerializer.values_for(self._sparse_fields()))
+        return queryset
+
+    def get_serializer_class(self):
+        if self._fast_read():
+            return AssetReadSerializer
+        return AssetSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self._fast_read():
+            context['fields'] = self._sparse_fields()
+        return context
+
     # === Custom Action: CHECKOUT ===
     @action(detail=True, methods=['post'], url_path='checkout')
     def checkout(self, request, pk=None):
@@ -55,12 +133,19 @@ class AssetViewSet(viewsets.ModelViewSet):
                 {"error": "employee_id is required."},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if not str(employee_id).isdigit():
+            return Response(
+                {"error": "employee_id must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # 3. Perform the Action
+        # 3. Perform the Action (conditional UPDATE, loses cleanly on a race)
         employee = get_object_or_404(User, id=employee_id)
-        asset.assigned_to = employee
-        asset.status = Asset.Status.ASSIGNED
-        asset.save() 
+        if not transition_asset(asset, 'checkout', employee=employee):
+            return Response(
+                {"error": "Asset was changed by another request. Reload and try again."},
+                status=status.HTTP_409_CONFLICT
+            )
 
         return Response({
             "status": "success", 
@@ -79,27 +164,200 @@ class AssetViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 2. Perform the Action
-        asset.assigned_to = None
-        asset.status = Asset.Status.AVAILABLE
-        asset.save() 
+        # 2. Perform the Action (conditional UPDATE, loses cleanly on a race)
+        if not transition_asset(asset, 'return'):
+            return Response(
+                {"error": "Asset was changed by another request. Reload and try again."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response({"status": "success", "message": "Asset returned to pool"})
+
+    # === Custom Action: HISTORY ===
+    @action(detail=True, methods=['get'], url_path='history')
+    def history(self, request, pk=None):
+        """
+        Audit trail of one asset, newest first (index lookup on auditlog_object_idx).
+        Archived entries are older than every live one, so the archive continues
+        where the live pages end: the last live page is topped up to the page
+        size, and its `next` link carries an ?archive= cursor from there on.
+        """
+        asset = self.get_object()
+        content_type_id = ContentType.objects.get_for_model(Asset).id
+        page_size = self.paginator.get_page_size(request)
+        archive_cursor = request.query_params.get('archive')
+        if archive_cursor is not None:
+            rows, next_cursor = archived_history_page(content_type_id, str(asset.pk), archive_cursor, page_size)
+            return Response({
+                'next': self._archive_link(request, next_cursor),
+                'previous': None,
+                'results': rows,
+            })
+
+        page = self.paginate_queryset(AuditLog.objects.for_object(asset))
+        data = list(AuditLogSerializer(page, many=True).data)
+        next_cursor = None
+        if self.paginator.get_next_link() is None:
+            room = page_size - len(data)
+            if room:
+                archived, next_cursor = archived_history_page(content_type_id, str(asset.pk), ARCHIVE_START, room)
+                data += archived
+            elif read_archived_history(content_type_id, str(asset.pk), limit=1):
+                next_cursor = ARCHIVE_START
+        response = self.get_paginated_response(data)
+        if next_cursor:
+            response.data['next'] = self._archive_link(request, next_cursor)
+        return response
+
+    @staticmethod
+    def _archive_link(request, archive_cursor):
+        if archive_cursor is None:
+            return None
+        url = remove_query_param(request.build_absolute_uri(), 'cursor')
+        return replace_query_param(url, 'archive', archive_cursor)
+
+    # === Custom Actions: BULK STATE TRANSITIONS ===
+    def _bulk_transition(self, request, action_name):
+        """
+        Body: {"asset_ids": [...]} (+ "employee_id" for checkout).
+        Applies the transition to every eligible asset in one transaction and
+        reports success or the reason for failure per asset.
+        """
+        asset_ids = request.data.get('asset_ids')
+        if not isinstance(asset_ids, list) or not asset_ids:
+            return Response(
+                {"error": "asset_ids must be a non-empty list."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(asset_ids) > settings.BULK_ACTION_MAX_ASSETS:
+            return Response(
+                {"error": f"At most {settings.BULK_ACTION_MAX_ASSETS} assets per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        employee = None
+        if action_name == 'checkout':
+            employee_id = request.data.get('employee_id')
+            if not employee_id:
+                return Response(
+                    {"error": "employee_id is required."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not str(employee_id).isdigit():
+                return Response(
+                    {"error": "employee_id must be an integer."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            employee = get_object_or_404(User, id=employee_id)
+
+        outcome = bulk_transition(asset_ids, action_name, employee=employee)
+        results = [
+            {"id": asset_id, "status": "success"} if error is None
+            else {"id": asset_id, "status": "failed", "error": error}
+            for asset_id, error in outcome.items()
+        ]
+        return Response({
+            "updated": sum(1 for error in outcome.values() if error is None),
+            "results": results,
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk-checkout')
+    def bulk_checkout(self, request):
+        return self._bulk_transition(request, 'checkout')
+
+    @action(detail=False, methods=['post'], url_path='bulk-return')
+    def bulk_return(self, request):
+        return self._bulk_transition(request, 'return')
+
+    @action(detail=False, methods=['post'], url_path='bulk-mark-broken')
+    def bulk_mark_broken(self, request):
+        return self._bulk_transition(request, 'mark_broken')
+
+    @action(detail=False, methods=['post'], url_path='bulk-mark-available')
+    def bulk_mark_available(self, request):
+        return self._bulk_transition(request, 'mark_available')
+
+    # === Custom Action: BULK IMPORT ===
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        """
+        Upload a CSV or JSONL file as 'file' (columns: name, serial_number, category, status).
+        Bad rows are reported by line number; the good ones are still imported.
+        """
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response(
+                {"error": "file is required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        file_format = request.data.get('file_format') or upload.name.rsplit('.', 1)[-1].lower()
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"Unsupported format. Use one of: {', '.join(IMPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        importer = AssetImporter(
+            create_categories=request.data.get('create_categories') in ('1', 'true', 'True')
+        )
+        try:
+            result = importer.run(upload, file_format)
+        except ValueError as exc:  # Not valid UTF-8: checked before any row is written
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict())
+
+    # === Custom Action: EXPORT ===
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Streams every matching asset as ?file_format=csv|jsonl (default csv), ?gzip=1 to compress.
+        Filters: ?search=, ?status=, ?category=<name>.
+        """
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Unsupported format. Use one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = asset_export_queryset(
+            self.filter_queryset(self.get_queryset()),
+            status=request.query_params.get('status'),
+            category=request.query_params.get('category'),
+        )
+        return export_response(
+            queryset,
+            ASSET_EXPORT_COLUMNS,
+            file_format,
+            filename='assets',
+            compress=request.query_params.get('gzip') in ('1', 'true'),
+        )
+
+class InventoryStatsView(APIView):
+    """
+    Dashboard numbers (status counters + per-category graph) as JSON.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(get_inventory_stats())
 
-        return Response({"status": "success", "message": "Asset returned to pool"})\
-    
 def mark_broken(request, asset_id):
     if request.method == 'POST':
         asset = get_object_or_404(Asset, id=asset_id)
-        asset.status = Asset.Status.BROKEN
-        asset.assigned_to = None  # Clear holder automatically
-        asset.save()
-        messages.warning(request, f"{asset.name} has been marked as broken.")
+        error = bulk_transition([asset.id], 'mark_broken', actions=DASHBOARD_ACTIONS)[str(asset.id)]  # Also clears the holder
+        if error:
+            messages.error(request, error)
+        else:
+            messages.warning(request, f"{asset.name} has been marked as broken.")
     return redirect('dashboard')
 
 def mark_available(request, asset_id):
     if request.method == 'POST':
         asset = get_object_or_404(Asset, id=asset_id)
-        asset.status = Asset.Status.AVAILABLE
-        asset.assigned_to = None  # Ensure it's not held by anyone
-        asset.save()
-        messages.success(request, f"{asset.name} is now back in the inventory!")
-    return redirect('dashboard')
\ No newline at end of file
+        error = bulk_transition([asset.id], 'mark_available', actions=DASHBOARD_ACTIONS)[str(asset.id)]  # Ensures no holder
+        if error:
+            messages.error(request, error)
+        else:
+            messages.success(request, f"{asset.name} is now back in the inventory!")
+    return redirect('dashboard')
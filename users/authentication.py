@@ -0,0 +1,120 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from common.metrics import metrics
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+# Claims copied from the User row into every access token
+USER_CLAIMS = ('role', 'is_active')
+
+
+class UserCache:
+    """
+    Bounded, TTL-evicted cache of User rows, local to this process.
+    - LRU: at most MAX_SIZE users; the least recently used one goes first.
+    - TTL: entries expire after TTL seconds, which bounds how long another
+      worker process can serve a user changed elsewhere.
+    - invalidate(): called from the User post_save/post_delete receivers.
+    """
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _config(self, key):
+        return settings.AUTH_USER_CACHE[key]
+
+    def get(self, user_id):
+        """
+        Returns (user, loaded_at) or (None, None).
+        """
+        user_id = str(user_id)  # Tokens carry the id as a string
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None, None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            # A copy, so nothing one request sets on request.user leaks into another
+            return copy.copy(entry[2]), entry[1]
+
+    def set(self, user_id, user):
+        user_id = str(user_id)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self._config('TTL'), time.time(), user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self._config('MAX_SIZE'):
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """
+        Drops the user now and again after COMMIT, so a request that read the
+        old row while the change was still uncommitted cannot keep it cached.
+        """
+        user_id = str(user_id)
+
+        def drop():
+            with self._lock:
+                self._entries.pop(user_id, None)
+
+        drop()
+        transaction.on_commit(drop)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+metrics.register_collector(lambda: [
+    ('techvault_cache_requests_total', {'cache': 'auth_user', 'result': 'hit'}, user_cache.hits),
+    ('techvault_cache_requests_total', {'cache': 'auth_user', 'result': 'miss'}, user_cache.misses),
+])
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Adds the user's role and is_active to the issued tokens.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that does not SELECT the user on every request.
+    Users come from `user_cache`; only a miss (first call, expiry, or a change
+    to the User row) costs a query. If a token issued after the row was
+    cached carries other role/is_active claims, the user was changed by
+    another process, so the row is reloaded.
+    """
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user, loaded_at = user_cache.get(user_id) if user_id is not None else (None, None)
+        if user is not None and not self._is_stale(user, loaded_at, validated_token):
+            return user
+
+        user = super().get_user(validated_token)  # Raises for unknown/inactive users
+        user_cache.set(user_id, user)
+        return copy.copy(user)
+
+    @staticmethod
+    def _is_stale(user, loaded_at, validated_token):
+        if validated_token.get('iat', 0) < loaded_at:
+            return False  # Older token: its claims may predate a change we already have
+        return any(
+            claim in validated_token and validated_token[claim] != getattr(user, claim)
+            for claim in USER_CLAIMS
+        )
@@ -1,3 +1,63 @@
-from django.test import TestCase
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from .authentication import user_cache
+from .models import User
 
-# Create your tests here.
+
+# /api/token/ hashes the password, slow on purpose: keep it out of the slow request log
+@override_settings(SQL_INSTRUMENTATION={**settings.SQL_INSTRUMENTATION, 'SLOW_REQUEST_MS': 10 ** 6})
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.export_url = reverse('auditlog-export')
+
+    def login(self):
+        response = self.client.post(
+            reverse('token_obtain_pair'), {'email': 'admin@test.com', 'password': 'password123'}, format='json',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + response.data['access'])
+        return response.data['access']
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [q['sql'] for q in queries.captured_queries if 'users_user' in q['sql']]
+
+    def test_token_carries_role(self):
+        token = AccessToken(self.login())
+        self.assertEqual(token['role'], 'ADMIN')
+        self.assertTrue(token['is_active'])
+
+    def test_user_is_loaded_once(self):
+        self.login()
+        url = reverse('category-list')
+        response, first = self.user_queries(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first), 1)
+
+        response, second = self.user_queries(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(second, [])
+
+    def test_role_change_applies_to_next_request(self):
+        self.login()
+        self.assertEqual(self.client.get(self.export_url).status_code, status.HTTP_200_OK)
+
+        self.admin.role = User.Role.EMPLOYEE
+        self.admin.save()
+        self.assertEqual(self.client.get(self.export_url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_deactivated_user_is_rejected(self):
+        self.login()
+        self.assertEqual(self.client.get(reverse('category-list')).status_code, status.HTTP_200_OK)
+
+        User.objects.filter(pk=self.admin.pk).update(is_active=False)  # No signal: stale cache
+        user_cache.invalidate(self.admin.pk)
+        self.assertEqual(self.client.get(reverse('category-list')).status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,3 +1,76 @@
+from unittest import mock
 from django.test import TestCase
+from django.urls import reverse
+from inventory.models import Asset, Category
+from users.models import User
+from . import views
 
-# Create your tests here.
+
+class DashboardPagingTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.employee = User.objects.create_user(
+            email='jane@test.com', password='password123', first_name='Jane', role='EMPLOYEE'
+        )
+        self.category = Category.objects.create(name="Laptops")
+        for i in range(5):
+            Asset.objects.create(name=f"Laptop {i}", serial_number=f"SN-{i}", category=self.category)
+        self.client.force_login(self.admin)
+
+    def test_keyset_pages_cover_every_asset_once(self):
+        """
+        Following the X-Next-Page links walks the whole table without gaps or repeats.
+        """
+        seen = []
+        query = ''
+        with mock.patch.object(views, 'DASHBOARD_PAGE_SIZE', 2):
+            while True:
+                response = self.client.get(f"{reverse('dashboard_asset_rows')}?{query}")
+                seen += [asset.serial_number for asset in response.context['assets']]
+                query = response['X-Next-Page']
+                if not query:
+                    break
+
+        self.assertEqual(sorted(seen), [f"SN-{i}" for i in range(5)])
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_dashboard_filters(self):
+        Asset.objects.filter(serial_number="SN-3").update(status=Asset.Status.BROKEN)
+
+        response = self.client.get(reverse('dashboard'), {'status': 'BROKEN'})
+        self.assertEqual([a.serial_number for a in response.context['assets']], ["SN-3"])
+
+        response = self.client.get(reverse('dashboard'), {'q': 'sn-1'})
+        self.assertEqual([a.serial_number for a in response.context['assets']], ["SN-1"])
+
+    def test_employee_search(self):
+        response = self.client.get(reverse('employee_search'), {'q': 'jan'})
+        self.assertEqual(response.json()['results'][0]['email'], 'jane@test.com')
+
+        response = self.client.get(reverse('employee_search'), {'q': 'nobody'})
+        self.assertEqual(response.json()['results'], [])
+
+
+class WebCheckoutTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password123')
+        self.employee = User.objects.create_user(
+            email='jane@test.com', password='password123', first_name='Jane', role='EMPLOYEE'
+        )
+        self.asset = Asset.objects.create(
+            name="Laptop", serial_number="SN-1", category=Category.objects.create(name="Laptops")
+        )
+        self.client.force_login(self.admin)
+
+    def test_non_numeric_employee_id_is_rejected(self):
+        response = self.client.post(
+            reverse('web_checkout', args=[self.asset.id]), {'employee_id': 'jane'}, follow=True
+        )
+        self.assertRedirects(response, reverse('dashboard'))
+        self.assertIn("Please pick an employee", [str(m) for m in response.context['messages']][0])
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.status, Asset.Status.AVAILABLE)
+
+        self.client.post(reverse('web_checkout', args=[self.asset.id]), {'employee_id': str(self.employee.id)})
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.assigned_to, self.employee)
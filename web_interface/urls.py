@@ -5,6 +5,8 @@ from . import views
 urlpatterns = [
     path('', views.CustomLoginView.as_view(), name='login'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/assets/', views.asset_rows, name='dashboard_asset_rows'),
+    path('employees/search/', views.employee_search, name='employee_search'),
     path('logout/', LogoutView.as_view(), name='logout'),
     
     # Asset Actions
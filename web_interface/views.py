@@ -2,7 +2,13 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.views import LoginView
 from django.contrib import messages
+from django.db.models import Q
+from django.http import JsonResponse
+from common.pagination import keyset_page
 from inventory.models import Asset, Category
+from inventory.search import search_assets
+from inventory.services import transition_asset
+from inventory.stats import get_inventory_stats
 from users.models import User
 
 # --- Helper ---
@@ -12,50 +18,111 @@ def is_admin(user):
 class CustomLoginView(LoginView):
     template_name = 'web_interface/login.html'
 
+DASHBOARD_PAGE_SIZE = 50
+EMPLOYEE_SEARCH_LIMIT = 20
+
+def _filtered_assets(request):
+    """
+    Server-side filters for the inventory table (?status= &category= &q=).
+    """
+    assets = Asset.objects.all().select_related('category', 'assigned_to')
+    status = request.GET.get('status')
+    category = request.GET.get('category')
+    query = request.GET.get('q', '').strip()
+
+    if status in Asset.Status.values:
+        assets = assets.filter(status=status)
+    if category and category.isdigit():
+        assets = assets.filter(category_id=category)
+    if query:
+        assets = search_assets(assets, query)
+    return assets
+
+def _asset_page(request):
+    return keyset_page(
+        _filtered_assets(request),
+        cursor=request.GET.get('cursor'),
+        page_size=DASHBOARD_PAGE_SIZE,
+    )
+
+def _next_page_query(request, next_cursor):
+    """
+    Keeps the active filters when building the "Load more" link.
+    """
+    if not next_cursor:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = next_cursor
+    return params.urlencode()
+
 @login_required
 def dashboard(request):
     user = request.user
     
-    # 1. FETCH ALL DATA
-    all_assets = Asset.objects.all().select_related('category', 'assigned_to').order_by('-created_at')
+    # 1. FETCH ONE PAGE OF ASSETS (keyset paging, the rest loads on demand)
+    assets, next_cursor = _asset_page(request)
     all_users = User.objects.all().order_by('-created_at') 
-    employees = User.objects.filter(role='EMPLOYEE') 
     categories = Category.objects.all()
     
     # 2. PERSONAL ASSETS
     my_assets = Asset.objects.filter(assigned_to=user)
 
-    # 3. CALCULATE STATS
-    stats = {
-        'total': all_assets.count(),
-        'assigned': all_assets.filter(status='ASSIGNED').count(),
-        'available': all_assets.filter(status='AVAILABLE').count(),
-        'broken': all_assets.filter(status='BROKEN').count(),
-        'user_count': all_users.count()
-    }
-
-    # 4. GRAPH DATA
-    graph_labels = []
-    graph_data = []
-    for cat in categories:
-        count = all_assets.filter(category=cat).count()
-        if count > 0:
-            graph_labels.append(cat.name)
-            graph_data.append(count)
+    # 3. STATS + GRAPH DATA (fixed number of queries, see inventory/stats.py)
+    summary = get_inventory_stats()
 
     context = {
-        'assets': all_assets,      
+        'assets': assets,      
+        'next_page_query': _next_page_query(request, next_cursor),
+        'filters': {
+            'status': request.GET.get('status', ''),
+            'category': request.GET.get('category', ''),
+            'q': request.GET.get('q', ''),
+        },
+        'status_choices': Asset.Status.choices,
         'my_assets': my_assets,    
         'all_users': all_users,    
-        'employees': employees,
         'categories': categories,  # <--- THIS LINE WAS MISSING!
-        'stats': stats,
-        'graph_labels': graph_labels,
-        'graph_data': graph_data,
+        'stats': summary['stats'],
+        'graph_labels': summary['graph_labels'],
+        'graph_data': summary['graph_data'],
         'is_admin': user.role == 'ADMIN' 
     }
     return render(request, 'web_interface/dashboard.html', context)
 
+@login_required
+def asset_rows(request):
+    """
+    Next page of the inventory table as an HTML fragment (used by "Load more").
+    The cursor for the page after this one is sent in the X-Next-Page header.
+    """
+    assets, next_cursor = _asset_page(request)
+    response = render(request, 'web_interface/asset_rows.html', {
+        'assets': assets,
+        'is_admin': request.user.role == 'ADMIN',
+    })
+    response['X-Next-Page'] = _next_page_query(request, next_cursor) or ''
+    return response
+
+@login_required
+@user_passes_test(is_admin)
+def employee_search(request):
+    """
+    Backs the shared employee picker: returns a few matching employees as JSON
+    instead of rendering the full list into every table row.
+    """
+    query = request.GET.get('q', '').strip()
+    employees = User.objects.filter(role='EMPLOYEE', is_active=True)
+    if query:
+        employees = employees.filter(
+            Q(first_name__icontains=query) |
+            Q(last_name__icontains=query) |
+            Q(email__icontains=query)
+        )
+    results = employees.order_by('first_name', 'id').values(
+        'id', 'first_name', 'last_name', 'email'
+    )[:EMPLOYEE_SEARCH_LIMIT]
+    return JsonResponse({'results': list(results)})
+
 # --- ACTIONS (Direct Assignment) ---
 @login_required
 def checkout_asset(request, asset_id):
@@ -66,17 +133,20 @@ def checkout_asset(request, asset_id):
     if request.method == 'POST':
         asset = get_object_or_404(Asset, id=asset_id)
         employee_id = request.POST.get('employee_id')
-        
+
+        if employee_id and not employee_id.isdigit():
+            messages.error(request, "Please pick an employee from the list.")
+            return redirect('dashboard')
+
         # VALIDATION: Only assign if Available
         if asset.status == 'AVAILABLE' and employee_id:
-            employee = User.objects.get(id=employee_id)
-            
-            # DIRECT ASSIGNMENT (No Email, No Pending)
-            asset.assigned_to = employee
-            asset.status = 'ASSIGNED'
-            asset.save() # Triggers Ghost Audit Log
+            employee = get_object_or_404(User, id=employee_id)
             
-            messages.success(request, f"Asset successfully assigned to {employee.first_name}.")
+            # DIRECT ASSIGNMENT (No Email, No Pending) - conditional UPDATE, race-safe
+            if transition_asset(asset, 'checkout', employee=employee):
+                messages.success(request, f"Asset successfully assigned to {employee.first_name}.")
+            else:
+                messages.error(request, "Asset was just changed by someone else. Please try again.")
         else:
             messages.error(request, "Could not checkout asset.")
             
@@ -91,10 +161,10 @@ def return_asset(request, asset_id):
     if request.method == 'POST':
         asset = get_object_or_404(Asset, id=asset_id)
         if asset.status == 'ASSIGNED':
-            asset.assigned_to = None
-            asset.status = 'AVAILABLE'
-            asset.save() # Triggers Ghost Audit Log
-            messages.success(request, "Asset returned to pool.")
+            if transition_asset(asset, 'return'):
+                messages.success(request, "Asset returned to pool.")
+            else:
+                messages.error(request, "Asset was just changed by someone else. Please try again.")
     return redirect('dashboard')
 
 # --- CREATE ACTIONS ---